@@ -8,6 +8,16 @@ specifically for comparing JJA 2023 SST patterns with MPI_GE model outputs.
 __version__ = "0.1.0"
 __author__ = "Quan Liu"
 
-from .pattern_correlation import calculate_pattern_correlation, calculate_spatial_correlation
+from .pattern_correlation import (
+    PatternCorrelator,
+    calculate_pattern_correlation,
+    calculate_spatial_correlation,
+    calculate_spatial_correlation_batched,
+)
 
-__all__ = ["calculate_pattern_correlation", "calculate_spatial_correlation"]
+__all__ = [
+    "PatternCorrelator",
+    "calculate_pattern_correlation",
+    "calculate_spatial_correlation",
+    "calculate_spatial_correlation_batched",
+]
@@ -0,0 +1,119 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Compiled kernel for the weighted pattern correlation
+
+This optional extension backs ``calculate_pattern_correlation(..., engine="c")``.
+It is built by setup.py when Cython is available; otherwise the NumPy
+implementation is used.
+"""
+
+from libc.math cimport isnan, NAN
+
+
+cdef Py_ssize_t _weighted_comoments(
+    const double* p1,
+    const double* p2,
+    const double* w,
+    Py_ssize_t n,
+    Py_ssize_t repeat,
+    bint centered,
+    double* out
+) noexcept nogil:
+    """
+    Single-pass weighted co-moments of p1 and p2, skipping NaN points.
+
+    Uses the weighted Welford recurrence when centered. A NULL w means
+    uniform weights; otherwise point i has weight w[i / repeat], tracked
+    with running indices instead of a division per point. Writes
+    (covariance, variance1, variance2), normalized by the sum of the valid
+    weights, to out and returns the number of valid points.
+    """
+    cdef Py_ssize_t i
+    cdef Py_ssize_t k = 0
+    cdef Py_ssize_t j = 0
+    cdef Py_ssize_t count = 0
+    cdef double x, y, wi, sw_new, d1, d2
+    cdef double sw = 0.0
+    cdef double mean1 = 0.0
+    cdef double mean2 = 0.0
+    cdef double c11 = 0.0
+    cdef double c22 = 0.0
+    cdef double c12 = 0.0
+
+    for i in range(n):
+        wi = w[k] if w != NULL else 1.0
+        j += 1
+        if j == repeat:
+            j = 0
+            k += 1
+        x = p1[i]
+        y = p2[i]
+        if isnan(x) or isnan(y):
+            continue
+        count += 1
+        if centered:
+            sw_new = sw + wi
+            if sw_new == 0.0:
+                continue
+            d1 = x - mean1
+            d2 = y - mean2
+            mean1 += wi / sw_new * d1
+            mean2 += wi / sw_new * d2
+            c11 += wi * d1 * (x - mean1)
+            c22 += wi * d2 * (y - mean2)
+            c12 += wi * d1 * (y - mean2)
+            sw = sw_new
+        else:
+            sw += wi
+            c11 += wi * x * x
+            c22 += wi * y * y
+            c12 += wi * x * y
+
+    if count == 0:
+        out[0] = NAN
+        out[1] = NAN
+        out[2] = NAN
+    else:
+        out[0] = c12 / sw
+        out[1] = c11 / sw
+        out[2] = c22 / sw
+    return count
+
+
+def _weighted_corr(
+    const double[::1] p1,
+    const double[::1] p2,
+    const double[::1] w,
+    bint centered,
+    Py_ssize_t repeat=1
+):
+    """
+    Weighted covariance and variances of two flattened float64 patterns.
+
+    Points where either pattern is NaN are skipped. An empty ``w`` means
+    uniform weights; otherwise point i has weight ``w[i // repeat]``.
+
+    Returns
+    -------
+    tuple
+        (number of valid points, covariance, variance1, variance2), where the
+        moments are normalized by the sum of the valid weights.
+    """
+    cdef double out[3]
+    cdef const double* w_ptr = &w[0] if w.shape[0] > 0 else NULL
+    cdef Py_ssize_t count
+
+    if repeat < 1:
+        raise ValueError("repeat must be positive")
+    if p1.shape[0] != p2.shape[0] or (
+        w_ptr != NULL and w.shape[0] * repeat != p1.shape[0]
+    ):
+        raise ValueError("Patterns and weights must have the same length")
+    if p1.shape[0] == 0:
+        return 0, NAN, NAN, NAN
+
+    with nogil:
+        count = _weighted_comoments(
+            &p1[0], &p2[0], w_ptr, p1.shape[0], repeat, centered, out
+        )
+    return count, out[0], out[1], out[2]
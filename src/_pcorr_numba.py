@@ -0,0 +1,278 @@
+"""
+Numba kernel for the weighted pattern correlation
+
+This module backs ``calculate_pattern_correlation(..., engine="numba")`` and
+requires numba to be installed.
+"""
+
+import functools
+import os
+
+import numpy as np
+from numba import get_num_threads, njit, prange, types
+
+# All fast-math flags except 'nnan'/'ninf': the kernel relies on isnan() to
+# mask missing points, which LLVM may fold away under the full 'fast' set.
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# Smallest number of points worth handing to a separate thread
+_MIN_CHUNK_SIZE = 4096
+
+# Flattened sizes of the standard grids (1 degree and 0.25 degree global)
+# that get a kernel compiled for their exact length
+_SPECIALIZED_SIZES = frozenset({180 * 360, 720 * 1440})
+
+# The specialized kernels cannot be cached to disk, so every new process
+# spends seconds compiling them; they only pay off over many thousands of
+# calls and are used only when NASST_NUMBA_SPECIALIZE=1
+_SPECIALIZE = os.environ.get("NASST_NUMBA_SPECIALIZE") == "1"
+
+# Read-only arrays, so broadcast or memory-mapped inputs match as well
+_READONLY_F8 = types.Array(types.float64, 1, 'C', readonly=True)
+_KERNEL_SIGNATURE = types.UniTuple(types.float64, 4)(
+    _READONLY_F8, _READONLY_F8, _READONLY_F8, types.boolean, types.intp
+)
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _comoments_chunk(p1, p2, w, weighted, repeat, centered, start, stop):
+    """
+    Single-pass co-moments of p1[start:stop] and p2[start:stop].
+
+    Uses the weighted Welford recurrence when centered, so the means and the
+    centered (co)variances are updated together from the raw values. Point i
+    has weight w[i // repeat], tracked with running indices instead of a
+    division per point.
+
+    Returns
+    -------
+    tuple
+        (count, sw, mean1, mean2, C11, C22, C12) with the sums of weighted
+        (centered) squares and cross products.
+    """
+    count = 0
+    sw = 0.0
+    mean1 = 0.0
+    mean2 = 0.0
+    c11 = 0.0
+    c22 = 0.0
+    c12 = 0.0
+    k = start // repeat
+    j = start - k * repeat
+    for i in range(start, stop):
+        wi = w[k] if weighted else 1.0
+        j += 1
+        if j == repeat:
+            j = 0
+            k += 1
+        x = p1[i]
+        y = p2[i]
+        if np.isnan(x) or np.isnan(y):
+            continue
+        count += 1
+        if centered:
+            sw_new = sw + wi
+            if sw_new == 0.0:
+                continue
+            d1 = x - mean1
+            d2 = y - mean2
+            mean1 += wi / sw_new * d1
+            mean2 += wi / sw_new * d2
+            c11 += wi * d1 * (x - mean1)
+            c22 += wi * d2 * (y - mean2)
+            c12 += wi * d1 * (y - mean2)
+            sw = sw_new
+        else:
+            sw += wi
+            c11 += wi * x * x
+            c22 += wi * y * y
+            c12 += wi * x * y
+    return count, sw, mean1, mean2, c11, c22, c12
+
+
+def _weighted_corr(p1, p2, w, centered, repeat=1):
+    """
+    Weighted covariance and variances of two flattened patterns.
+
+    Points where either pattern is NaN are skipped. An empty ``w`` means
+    uniform weights; otherwise point i has weight ``w[i // repeat]``, so
+    weights broadcast along trailing axes (e.g. 1-D latitude weights of a
+    (lat, lon) field) are passed once per row. The data is read once: every
+    thread runs the single-pass recurrence over its own chunk and the
+    partial co-moments are merged afterwards (Chan et al.'s pairwise
+    update).
+
+    Returns
+    -------
+    tuple
+        (number of valid points, covariance, variance1, variance2), where the
+        moments are normalized by the sum of the valid weights.
+    """
+    n = p1.shape[0]
+    if (
+        _SPECIALIZE
+        and n in _SPECIALIZED_SIZES
+        and p1.dtype == p2.dtype == w.dtype == np.float64
+    ):
+        count, cov, var1, var2 = _make_kernel(n)(p1, p2, w, centered, repeat)
+        return int(count), cov, var1, var2
+
+    n_chunks = max(1, min(get_num_threads(), n // _MIN_CHUNK_SIZE))
+    return _weighted_corr_chunked(p1, p2, w, centered, n_chunks, repeat)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_kernel(n):
+    """
+    _weighted_corr kernel compiled for float64 patterns of exactly n points.
+
+    The length is a compile-time constant of the closure, so the loops have
+    a fixed trip count. Unlike the Welford recurrence, whose running means
+    serialize the loop, the two branchless passes (weighted sums, then
+    centered co-moments) can be unrolled and vectorized by LLVM. The
+    explicit signature compiles the kernel once, when it is first requested.
+
+    The returned kernel expects patterns of length n; an empty ``w`` means
+    uniform weights, otherwise point i has weight ``w[i // repeat]``. Rows
+    of repeated weights are reduced unweighted and then scaled by their
+    weight, so no per-point division is needed. It returns the count as a
+    float64.
+    """
+    @njit(_KERNEL_SIGNATURE, parallel=True, fastmath=_FASTMATH)
+    def kernel(p1, p2, w, centered, repeat):
+        weighted = w.shape[0] > 0
+        per_point = not weighted or repeat == 1
+
+        count = 0.0
+        sw = 0.0
+        s1 = 0.0
+        s2 = 0.0
+        if per_point:
+            for i in prange(n):
+                valid = not (np.isnan(p1[i]) or np.isnan(p2[i]))
+                wi = (w[i] if weighted else 1.0) if valid else 0.0
+                count += 1.0 if valid else 0.0
+                sw += wi
+                s1 += wi * p1[i] if valid else 0.0
+                s2 += wi * p2[i] if valid else 0.0
+        else:
+            for r in prange(n // repeat):
+                # Row views indexed from 0 keep the inner loop free of
+                # negative-index checks, so it vectorizes
+                row1 = p1[r * repeat:(r + 1) * repeat]
+                row2 = p2[r * repeat:(r + 1) * repeat]
+                row_count = 0.0
+                row_s1 = 0.0
+                row_s2 = 0.0
+                for j in range(repeat):
+                    valid = not (np.isnan(row1[j]) or np.isnan(row2[j]))
+                    row_count += 1.0 if valid else 0.0
+                    row_s1 += row1[j] if valid else 0.0
+                    row_s2 += row2[j] if valid else 0.0
+                count += row_count
+                sw += w[r] * row_count
+                s1 += w[r] * row_s1
+                s2 += w[r] * row_s2
+
+        if count == 0.0:
+            return 0.0, np.nan, np.nan, np.nan
+        if sw == 0.0:
+            return count, np.nan, np.nan, np.nan
+
+        mean1 = s1 / sw if centered else 0.0
+        mean2 = s2 / sw if centered else 0.0
+
+        c11 = 0.0
+        c22 = 0.0
+        c12 = 0.0
+        if per_point:
+            for i in prange(n):
+                valid = not (np.isnan(p1[i]) or np.isnan(p2[i]))
+                wi = (w[i] if weighted else 1.0) if valid else 0.0
+                d1 = p1[i] - mean1 if valid else 0.0
+                d2 = p2[i] - mean2 if valid else 0.0
+                c11 += wi * d1 * d1
+                c22 += wi * d2 * d2
+                c12 += wi * d1 * d2
+        else:
+            for r in prange(n // repeat):
+                row1 = p1[r * repeat:(r + 1) * repeat]
+                row2 = p2[r * repeat:(r + 1) * repeat]
+                row_c11 = 0.0
+                row_c22 = 0.0
+                row_c12 = 0.0
+                for j in range(repeat):
+                    valid = not (np.isnan(row1[j]) or np.isnan(row2[j]))
+                    d1 = row1[j] - mean1 if valid else 0.0
+                    d2 = row2[j] - mean2 if valid else 0.0
+                    row_c11 += d1 * d1
+                    row_c22 += d2 * d2
+                    row_c12 += d1 * d2
+                c11 += w[r] * row_c11
+                c22 += w[r] * row_c22
+                c12 += w[r] * row_c12
+
+        return count, c12 / sw, c11 / sw, c22 / sw
+
+    return kernel
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _weighted_corr_chunked(p1, p2, w, centered, n_chunks, repeat=1):
+    """Body of _weighted_corr, split into n_chunks independent chunks."""
+    n = p1.shape[0]
+    weighted = w.shape[0] > 0
+    chunk_size = (n + n_chunks - 1) // n_chunks
+
+    counts = np.zeros(n_chunks, dtype=np.int64)
+    partial = np.zeros((n_chunks, 6))
+    for c in prange(n_chunks):
+        start = c * chunk_size
+        stop = min(start + chunk_size, n)
+        count, sw, mean1, mean2, c11, c22, c12 = _comoments_chunk(
+            p1, p2, w, weighted, repeat, centered, start, stop
+        )
+        counts[c] = count
+        partial[c, 0] = sw
+        partial[c, 1] = mean1
+        partial[c, 2] = mean2
+        partial[c, 3] = c11
+        partial[c, 4] = c22
+        partial[c, 5] = c12
+
+    count = 0
+    sw = 0.0
+    mean1 = 0.0
+    mean2 = 0.0
+    c11 = 0.0
+    c22 = 0.0
+    c12 = 0.0
+    for c in range(n_chunks):
+        count += counts[c]
+        sw_b = partial[c, 0]
+        if sw_b == 0.0:
+            continue
+        sw_new = sw + sw_b
+        if centered:
+            d1 = partial[c, 1] - mean1
+            d2 = partial[c, 2] - mean2
+            factor = sw * sw_b / sw_new
+            c11 += partial[c, 3] + d1 * d1 * factor
+            c22 += partial[c, 4] + d2 * d2 * factor
+            c12 += partial[c, 5] + d1 * d2 * factor
+            mean1 += d1 * sw_b / sw_new
+            mean2 += d2 * sw_b / sw_new
+        else:
+            c11 += partial[c, 3]
+            c22 += partial[c, 4]
+            c12 += partial[c, 5]
+        sw = sw_new
+
+    if count == 0:
+        return 0, np.nan, np.nan, np.nan
+
+    # All valid points have zero weight: the moments are undefined
+    if sw == 0.0:
+        return count, np.nan, np.nan, np.nan
+
+    return count, c12 / sw, c11 / sw, c22 / sw
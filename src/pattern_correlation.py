@@ -5,17 +5,22 @@ This module provides functions for calculating pattern correlation between
 SST (Sea Surface Temperature) patterns.
 """
 
+import functools
+import warnings
+
 import numpy as np
 import xarray as xr
-from typing import Union
+from typing import Sequence, Union
 
 
 def calculate_pattern_correlation(
     pattern1: Union[np.ndarray, xr.DataArray],
     pattern2: Union[np.ndarray, xr.DataArray],
     weights: Union[np.ndarray, xr.DataArray, None] = None,
-    centered: bool = True
-) -> float:
+    centered: Union[bool, str] = True,
+    engine: str = "numpy",
+    dtype: Union[np.dtype, type, str, None] = None
+) -> Union[float, xr.DataArray]:
     """
     Calculate the pattern correlation between two spatial patterns.
     
@@ -30,16 +35,43 @@ def calculate_pattern_correlation(
     pattern2 : np.ndarray or xr.DataArray
         Second spatial pattern (e.g., SST anomalies from model)
     weights : np.ndarray, xr.DataArray, or None, optional
-        Weights for each grid point (e.g., cosine of latitude for area weighting).
-        If None, all points are equally weighted. Default is None.
-    centered : bool, optional
+        Weights for each grid point (e.g., cosine of latitude for area weighting),
+        broadcastable to the pattern shape. If None, all points are equally
+        weighted. Default is None.
+    centered : bool or "auto", optional
         If True, center the patterns by removing their weighted means before 
-        calculating correlation. Default is True.
+        calculating correlation. "auto" skips the centering for patterns that
+        are already centered (e.g. anomalies), i.e. whose weighted means are
+        below 1e-6 times their weighted RMS, and centers them otherwise; the
+        compiled and numexpr engines center in the same pass anyway and treat
+        it as True. Default is True.
+    engine : {"numpy", "numba", "c", "numexpr"}, optional
+        Backend for the reduction. "numba" runs a fused, multi-threaded
+        JIT-compiled loop and requires numba to be installed. "numexpr"
+        evaluates the masked products inside numexpr reductions, so they are
+        never materialized, and requires numexpr. "c" runs the
+        same single-pass loop from the optional compiled extension (built by
+        setup.py when Cython is available, float64 only) and falls back to
+        "numpy" with a RuntimeWarning if it is not built. Default is "numpy".
+    dtype : np.float32, np.float64 or None, optional
+        Floating point type to compute in, e.g. np.float32. Inputs are cast
+        (without a copy if they already match) and the reductions are done
+        in this type. Single precision halves the memory traffic of this
+        bandwidth-bound reduction, at single precision accuracy. The "c" and
+        "numexpr" engines ignore it for the computation, which is always done
+        in float64; the result is returned in this type for every engine. If
+        None, inputs of any other type (e.g. float32 or integer fields) are
+        cast to float64 and the computation is done in float64. Default is
+        None.
     
     Returns
     -------
-    float
-        Pattern correlation coefficient (between -1 and 1)
+    float or xr.DataArray
+        Pattern correlation coefficient (between -1 and 1). If either pattern
+        is a Dask-backed DataArray, a lazy 0-d DataArray is returned instead;
+        call ``.compute()`` to evaluate it. Since the lazy result cannot
+        raise, it is NaN where the in-memory path raises ValueError (no valid
+        points, or a zero-variance pattern).
     
     Examples
     --------
@@ -57,77 +89,539 @@ def calculate_pattern_correlation(
     Notes
     -----
     - NaN values are automatically masked out in the calculation
-    - Patterns should have the same shape
+    - With centered=False the NumPy engine sums the products pairwise for
+      accuracy, which allocates one full-size product temporary
+    - Patterns should have the same shape; weights may be any shape that
+      broadcasts against them (e.g. cos(lat)[:, np.newaxis]), and DataArray
+      weights are broadcast by dimension name (e.g. 1-D along 'lat')
     - For SST patterns, it's common to use cosine of latitude as weights
       to account for grid cell area differences
+    - Dask-backed inputs are reduced chunk by chunk with xarray's weighted
+      operations (engine is ignored and centered="auto" centers); the chunks
+      are only loaded when the result is computed
     """
-    # Convert xarray DataArrays to numpy arrays if needed
+    if engine not in ("numpy", "numba", "c", "numexpr"):
+        raise ValueError(
+            f"Unknown engine '{engine}'. "
+            f"Use 'numpy', 'numba', 'c' or 'numexpr'."
+        )
+    _check_centered(centered)
+    _working_dtype(dtype)
+    
+    # Validate labelled inputs on their metadata before any data is loaded
+    if isinstance(pattern1, xr.DataArray) and isinstance(pattern2, xr.DataArray):
+        pattern1, pattern2 = _align_patterns(pattern1, pattern2)
+    
+    # Keep Dask-backed inputs lazy instead of loading them with .values
+    if _is_dask_backed(pattern1) or _is_dask_backed(pattern2):
+        return _pattern_correlation_dask(pattern1, pattern2, weights, centered, dtype)
+    
+    return _pattern_correlation_array(
+        pattern1, pattern2, weights, centered, engine, dtype
+    )
+
+
+def _check_centered(centered) -> None:
+    """Reject centered options other than True, False and 'auto'."""
+    if centered not in (True, False, "auto"):
+        raise ValueError(
+            f"centered must be True, False or 'auto'. Got {centered!r}"
+        )
+
+
+def _working_dtype(dtype: Union[np.dtype, type, str, None]) -> np.dtype:
+    """The dtype to compute in: float64 unless float32 is requested."""
+    work_dtype = np.dtype(np.float64 if dtype is None else dtype)
+    if work_dtype not in (np.float32, np.float64):
+        raise ValueError(
+            f"dtype must be np.float32, np.float64 or None. Got {dtype!r}"
+        )
+    return work_dtype
+
+
+def _pattern_correlation_array(
+    pattern1: Union[np.ndarray, xr.DataArray],
+    pattern2: Union[np.ndarray, xr.DataArray],
+    weights: Union[np.ndarray, xr.DataArray, None] = None,
+    centered: Union[bool, str] = True,
+    engine: str = "numpy",
+    dtype: Union[np.dtype, type, str, None] = None
+) -> float:
+    """Pattern correlation of in-memory arrays (see calculate_pattern_correlation)."""
+    # Check that patterns have the same shape (from metadata, nothing is
+    # loaded or copied yet)
+    if np.shape(pattern1) != np.shape(pattern2):
+        raise ValueError(
+            f"Patterns must have the same shape. "
+            f"Got pattern1: {np.shape(pattern1)}, pattern2: {np.shape(pattern2)}"
+        )
+    
+    # Compute in the working dtype (float64 unless requested otherwise), also
+    # for float32 or integer inputs. The C extension and numexpr always
+    # compute in float64, so rounding their inputs to float32 first would
+    # only add copies
+    work_dtype = _working_dtype(dtype)
+    compute_dtype = np.dtype(np.float64) if engine in ("c", "numexpr") else work_dtype
+    
+    # Broadcast named weight dimensions (e.g. 1-D weights along 'lat')
+    # against the pattern; this is a view, not a full-grid copy. The weights
+    # are cast first, so e.g. float32 latitude weights are not cast on the
+    # full grid below
+    if isinstance(weights, xr.DataArray) and isinstance(pattern1, xr.DataArray):
+        weights = _match_weight_labels(weights, pattern1)
+        weights = weights.astype(compute_dtype, copy=False)
+        weights = weights.broadcast_like(pattern1).transpose(*pattern1.dims)
+    
+    # Unwrap xarray DataArrays (.data avoids the extra conversion .values
+    # does; the arrays are in memory at this point)
     if isinstance(pattern1, xr.DataArray):
-        pattern1 = pattern1.values
+        pattern1 = pattern1.data
     if isinstance(pattern2, xr.DataArray):
-        pattern2 = pattern2.values
+        pattern2 = pattern2.data
     if isinstance(weights, xr.DataArray):
-        weights = weights.values
+        weights = weights.data
     
     # Ensure patterns are numpy arrays
     pattern1 = np.asarray(pattern1)
     pattern2 = np.asarray(pattern2)
+    if weights is not None:
+        weights = np.asarray(weights)
     
-    # Check that patterns have the same shape
-    if pattern1.shape != pattern2.shape:
-        raise ValueError(
-            f"Patterns must have the same shape. "
-            f"Got pattern1: {pattern1.shape}, pattern2: {pattern2.shape}"
+    # No copy if the inputs already match the compute dtype
+    pattern1 = pattern1.astype(compute_dtype, copy=False)
+    pattern2 = pattern2.astype(compute_dtype, copy=False)
+    if weights is not None:
+        weights = weights.astype(compute_dtype, copy=False)
+    
+    if weights is not None:
+        weights = _broadcast_weights(weights, pattern1.shape)
+    
+    # Flatten patterns for easier computation (a view where possible). 1-D
+    # inputs, e.g. a strided column of a larger array, are used as they are
+    pattern1_flat = pattern1 if pattern1.ndim == 1 else np.ravel(pattern1)
+    pattern2_flat = pattern2 if pattern2.ndim == 1 else np.ravel(pattern2)
+    
+    if engine != "numpy" and centered == "auto":
+        centered = True
+    
+    kernel = None
+    if engine not in ("numpy", "numexpr"):
+        kernel = _compiled_kernel(engine)
+    
+    if engine == "numexpr":
+        correlation = _pattern_correlation_numexpr(
+            pattern1_flat, pattern2_flat, weights, centered
         )
+    elif kernel is not None:
+        correlation = _pattern_correlation_kernel(
+            kernel, pattern1_flat, pattern2_flat, weights, centered,
+            compute_dtype
+        )
+    else:
+        correlation = _pattern_correlation_numpy(
+            pattern1_flat, pattern2_flat, weights, centered, compute_dtype
+        )
+    
+    # Every engine returns the working dtype (the lazy result declares it)
+    return work_dtype.type(correlation)
+
+
+def _match_weight_labels(weights: xr.DataArray, data: xr.DataArray) -> xr.DataArray:
+    """
+    Weights reordered to the coordinate labels of data.
+    
+    Dimensions indexed in both must carry the same labels (in any order), so
+    that e.g. reversed latitudes are paired up by label; weights covering
+    only part of the data raise ValueError instead of being padded with NaN.
+    """
+    indexed = [d for d in weights.dims if d in weights.indexes and d in data.indexes]
+    for name in indexed:
+        if not weights.indexes[name].sort_values().equals(
+            data.indexes[name].sort_values()
+        ):
+            raise ValueError(
+                f"Weights must have the same '{name}' coordinates as the data"
+            )
+    return weights.reindex({name: data.indexes[name] for name in indexed})
+
+
+def _broadcast_weights(weights: np.ndarray, shape: tuple) -> np.ndarray:
+    """Read-only view of weights broadcast to the pattern shape."""
+    try:
+        return np.broadcast_to(weights, shape)
+    except ValueError:
+        raise ValueError(
+            f"Weights must have the same shape as patterns or be broadcastable "
+            f"to it. Got weights: {weights.shape}, patterns: {shape}"
+        ) from None
+
+
+def _pattern_correlation_numpy(
+    pattern1_flat: np.ndarray,
+    pattern2_flat: np.ndarray,
+    weights: Union[np.ndarray, None],
+    centered: Union[bool, str],
+    dtype: np.dtype = np.float64
+) -> float:
+    """Pattern correlation of flattened patterns using fused NumPy reductions."""
+    # Only build the NaN mask when there is something to mask; complete
+    # fields (the common case) are reduced directly on the raw arrays
+    has_nan = np.isnan(pattern1_flat).any() or np.isnan(pattern2_flat).any()
     
-    # Flatten patterns for easier computation
-    pattern1_flat = pattern1.flatten()
-    pattern2_flat = pattern2.flatten()
+    if has_nan:
+        # Create mask for valid (non-NaN) values
+        valid_mask = ~(np.isnan(pattern1_flat) | np.isnan(pattern2_flat))
+        n_valid = np.count_nonzero(valid_mask)
+    else:
+        n_valid = pattern1_flat.size
+    
+    if n_valid == 0:
+        raise ValueError("No valid (non-NaN) data points found in both patterns")
     
-    # Create mask for valid (non-NaN) values
-    valid_mask = ~(np.isnan(pattern1_flat) | np.isnan(pattern2_flat))
+    if has_nan:
+        # Zero out invalid points instead of fancy-indexing them away, so that
+        # every reduction below is a single fused pass over the full arrays
+        pattern1_safe = np.where(valid_mask, pattern1_flat, 0.0)
+        pattern2_safe = np.where(valid_mask, pattern2_flat, 0.0)
+        
+        # Handle weights (invalid points get zero weight)
+        if weights is None:
+            weights_valid = valid_mask.astype(dtype)
+        else:
+            weights_valid = np.ravel(
+                np.where(valid_mask.reshape(weights.shape), weights, 0.0)
+            )
+    elif weights is None:
+        pattern1_safe = pattern1_flat
+        pattern2_safe = pattern2_flat
+        
+        # Uniform weights need no array at all
+        weights_valid = None
+    else:
+        # Reduce over the pattern shape with the (possibly stride-0,
+        # broadcast) weights view; raveling it would copy a full weight grid
+        pattern1_safe = pattern1_flat.reshape(weights.shape)
+        pattern2_safe = pattern2_flat.reshape(weights.shape)
+        weights_valid = weights
     
+    # The weights are not normalized: the moments are divided by the weight
+    # sum as scalars, which leaves the caller's array untouched
+    weight_sum = n_valid if weights_valid is None else np.sum(weights_valid)
+    
+    if not centered:
+        # Uncentered sums of squares of raw values (e.g. SST in Kelvin) are
+        # large and all positive; accumulate them pairwise (np.add.reduce)
+        # rather than sequentially, at the cost of one product temporary
+        def weighted_sum(a, b):
+            # Fresh array in the working dtype (also for integer patterns)
+            products = np.multiply(a, b, dtype=dtype)
+            if weights_valid is not None:
+                products *= weights_valid
+            return np.add.reduce(products, axis=None)
+    elif weights_valid is None:
+        def weighted_sum(a, b):
+            # In the working dtype, so integer patterns cannot overflow
+            return np.dot(a.astype(dtype, copy=False), b.astype(dtype, copy=False))
+    else:
+        sum_of_products = _full_sum_subscripts(weights_valid.ndim, 3)
+        
+        def weighted_sum(a, b):
+            # einsum fuses the products into the sum
+            return np.einsum(sum_of_products, weights_valid, a, b)
+    
+    # Center the patterns if requested (weighted means as BLAS dot products
+    # of flat arrays, or einsum over the shape of broadcast weights)
+    if centered:
+        if weights_valid is None:
+            pattern1_mean = np.sum(pattern1_safe) / weight_sum
+            pattern2_mean = np.sum(pattern2_safe) / weight_sum
+        elif weights_valid.ndim == 1:
+            pattern1_mean = np.dot(weights_valid, pattern1_safe) / weight_sum
+            pattern2_mean = np.dot(weights_valid, pattern2_safe) / weight_sum
+        else:
+            subscripts = _full_sum_subscripts(weights_valid.ndim, 2)
+            pattern1_mean = np.einsum(subscripts, weights_valid, pattern1_safe) / weight_sum
+            pattern2_mean = np.einsum(subscripts, weights_valid, pattern2_safe) / weight_sum
+        
+        if centered == "auto":
+            # Nearly zero-mean patterns (e.g. anomalies) are used as they
+            # are: their raw second moments are already the variances
+            variance1 = weighted_sum(pattern1_safe, pattern1_safe) / weight_sum
+            variance2 = weighted_sum(pattern2_safe, pattern2_safe) / weight_sum
+            if (
+                np.abs(pattern1_mean) < 1e-6 * np.sqrt(variance1)
+                and np.abs(pattern2_mean) < 1e-6 * np.sqrt(variance2)
+            ):
+                covariance = weighted_sum(pattern1_safe, pattern2_safe) / weight_sum
+                return _correlation_from_moments(covariance, variance1, variance2)
+        
+        pattern1_centered = pattern1_safe - pattern1_mean
+        pattern2_centered = pattern2_safe - pattern2_mean
+    else:
+        pattern1_centered = pattern1_safe
+        pattern2_centered = pattern2_safe
+    
+    # Calculate weighted covariance and variances
+    covariance = weighted_sum(pattern1_centered, pattern2_centered) / weight_sum
+    variance1 = weighted_sum(pattern1_centered, pattern1_centered) / weight_sum
+    variance2 = weighted_sum(pattern2_centered, pattern2_centered) / weight_sum
+    
+    return _correlation_from_moments(covariance, variance1, variance2)
+
+
+def _full_sum_subscripts(ndim: int, n_operands: int) -> str:
+    """einsum subscripts summing an elementwise product, e.g. 'ab,ab->'."""
+    axes = 'abcdefghijklmnopqrstuvwxyz'[:ndim]
+    return ','.join([axes] * n_operands) + '->'
+
+
+def _pattern_correlation_numexpr(
+    pattern1_flat: np.ndarray,
+    pattern2_flat: np.ndarray,
+    weights: Union[np.ndarray, None],
+    centered: bool
+) -> float:
+    """Pattern correlation of flattened patterns using numexpr reductions."""
+    try:
+        import numexpr as ne
+    except ImportError as err:
+        raise ImportError("engine='numexpr' requires numexpr to be installed") from err
+    
+    if weights is not None:
+        # Evaluate over the pattern shape, so numexpr reads the (possibly
+        # broadcast) weights view instead of a raveled full-size copy
+        pattern1_flat = pattern1_flat.reshape(weights.shape)
+        pattern2_flat = pattern2_flat.reshape(weights.shape)
+    
+    # NaN != NaN, so the mask is evaluated in one fused pass as well
+    valid_mask = ne.evaluate(
+        "(p1 == p1) & (p2 == p2)",
+        local_dict={'p1': pattern1_flat, 'p2': pattern2_flat}
+    )
     if not np.any(valid_mask):
         raise ValueError("No valid (non-NaN) data points found in both patterns")
     
-    # Apply mask
-    pattern1_valid = pattern1_flat[valid_mask]
-    pattern2_valid = pattern2_flat[valid_mask]
+    local_dict = {
+        'p1': pattern1_flat,
+        'p2': pattern2_flat,
+        'valid': valid_mask,
+        'w': 1.0 if weights is None else weights,
+    }
+    
+    def weighted_sum(expression):
+        return ne.evaluate(
+            f"sum(where(valid, w * {expression}, 0.0))", local_dict=local_dict
+        )[()]
+    
+    weight_sum = weighted_sum("1.0")
+    if centered:
+        local_dict['m1'] = weighted_sum("p1") / weight_sum
+        local_dict['m2'] = weighted_sum("p2") / weight_sum
+    else:
+        local_dict['m1'] = 0.0
+        local_dict['m2'] = 0.0
     
-    # Handle weights
+    covariance = weighted_sum("(p1 - m1) * (p2 - m2)") / weight_sum
+    variance1 = weighted_sum("(p1 - m1) ** 2") / weight_sum
+    variance2 = weighted_sum("(p2 - m2) ** 2") / weight_sum
+    
+    return _correlation_from_moments(covariance, variance1, variance2)
+
+
+def _compiled_kernel(engine: str):
+    """
+    The _weighted_corr kernel of a compiled engine.
+    
+    Returns None (after warning) if the optional C extension is not built.
+    """
+    # Only a missing numba or a missing extension module is translated; any
+    # other import error (e.g. this module imported outside its package) is
+    # raised as it is
+    if engine == "numba":
+        try:
+            from ._pcorr_numba import _weighted_corr
+        except ImportError as err:
+            if err.name != "numba":
+                raise
+            raise ImportError("engine='numba' requires numba to be installed") from err
+        return _weighted_corr
+    
+    try:
+        from ._pcorr_c import _weighted_corr
+    except ImportError as err:
+        if err.name is None or not err.name.endswith("._pcorr_c"):
+            raise
+        warnings.warn(
+            "The compiled extension for engine='c' is not built (reinstall "
+            "with Cython available); falling back to engine='numpy'.",
+            RuntimeWarning,
+            stacklevel=4
+        )
+        return None
+    return _weighted_corr
+
+
+def _pattern_correlation_kernel(
+    kernel,
+    pattern1_flat: np.ndarray,
+    pattern2_flat: np.ndarray,
+    weights: Union[np.ndarray, None],
+    centered: bool,
+    dtype: np.dtype = np.float64
+) -> float:
+    """Pattern correlation of flattened patterns using a compiled kernel."""
+    pattern1_flat = np.ascontiguousarray(pattern1_flat, dtype=dtype)
+    pattern2_flat = np.ascontiguousarray(pattern2_flat, dtype=dtype)
     if weights is None:
-        weights_valid = np.ones_like(pattern1_valid)
+        weights_flat = np.empty(0, dtype=dtype)
+        repeat = 1
     else:
-        weights = np.asarray(weights)
-        if weights.shape != pattern1.shape:
+        weights_flat, repeat = _compact_weights(weights)
+        weights_flat = np.ascontiguousarray(weights_flat, dtype=dtype)
+    
+    count, covariance, variance1, variance2 = kernel(
+        pattern1_flat, pattern2_flat, weights_flat, centered, repeat
+    )
+    
+    if count == 0:
+        raise ValueError("No valid (non-NaN) data points found in both patterns")
+    
+    return _correlation_from_moments(covariance, variance1, variance2)
+
+
+def _compact_weights(weights: np.ndarray) -> tuple:
+    """
+    Flattened weights without their trailing broadcast axes.
+    
+    Returns (values, repeat) such that point i of the flattened pattern has
+    weight values[i // repeat]. For cos(lat)[:, np.newaxis] broadcast to
+    (lat, lon) this is the 1-D latitude weights and repeat = n_lon, so the
+    compiled kernels never see a full-size weight grid.
+    """
+    n_trailing = 0
+    for size, stride in zip(weights.shape[::-1], weights.strides[::-1]):
+        if stride != 0 and size != 1:
+            break
+        n_trailing += 1
+    
+    repeat = int(np.prod(weights.shape[weights.ndim - n_trailing:]))
+    values = weights[(Ellipsis,) + (0,) * n_trailing]
+    return np.ravel(values), repeat
+
+
+def _align_patterns(
+    pattern1: xr.DataArray,
+    pattern2: xr.DataArray
+) -> tuple:
+    """
+    Check that two DataArrays line up, using only their metadata.
+    
+    Patterns over the same dimensions must have identical sizes and
+    coordinates (xr.align with join='exact'); pattern2 is then transposed to
+    the dimension order of pattern1. Patterns over differently named
+    dimensions are compared positionally, as plain arrays.
+    """
+    if set(pattern1.dims) != set(pattern2.dims):
+        return pattern1, pattern2
+    
+    try:
+        pattern1, pattern2 = xr.align(pattern1, pattern2, join='exact', copy=False)
+    except ValueError as err:
+        raise ValueError(
+            f"Patterns must have the same shape and coordinates. {err}"
+        ) from None
+    
+    return pattern1, pattern2.transpose(*pattern1.dims)
+
+
+def _is_dask_backed(data) -> bool:
+    """Whether data is an xarray DataArray backed by a Dask array."""
+    return isinstance(data, xr.DataArray) and data.chunks is not None
+
+
+def _pattern_correlation_dask(
+    pattern1: Union[np.ndarray, xr.DataArray],
+    pattern2: Union[np.ndarray, xr.DataArray],
+    weights: Union[np.ndarray, xr.DataArray, None],
+    centered: Union[bool, str],
+    dtype: Union[np.dtype, type, str, None]
+) -> xr.DataArray:
+    """Lazy pattern correlation when at least one pattern is Dask-backed."""
+    if not isinstance(pattern1, xr.DataArray):
+        pattern1 = _as_dataarray_like(pattern1, pattern2, "pattern1")
+    if not isinstance(pattern2, xr.DataArray):
+        pattern2 = _as_dataarray_like(pattern2, pattern1, "pattern2")
+    
+    if set(pattern2.dims) != set(pattern1.dims):
+        # Differently named dimensions are compared positionally, as on the
+        # in-memory path, so pattern2 takes over the dimensions of pattern1
+        if pattern1.shape != pattern2.shape:
             raise ValueError(
-                f"Weights must have the same shape as patterns. "
-                f"Got weights: {weights.shape}, patterns: {pattern1.shape}"
+                f"Patterns must have the same shape. "
+                f"Got pattern1: {pattern1.shape}, pattern2: {pattern2.shape}"
             )
-        weights_flat = weights.flatten()
-        weights_valid = weights_flat[valid_mask]
+        pattern2 = xr.DataArray(pattern2.data, dims=pattern1.dims)
     
-    # Normalize weights
-    weights_valid = weights_valid / np.sum(weights_valid)
+    dims = list(pattern1.dims)
     
-    # Center the patterns if requested
-    if centered:
-        pattern1_mean = np.sum(pattern1_valid * weights_valid)
-        pattern2_mean = np.sum(pattern2_valid * weights_valid)
-        pattern1_centered = pattern1_valid - pattern1_mean
-        pattern2_centered = pattern2_valid - pattern2_mean
-    else:
-        pattern1_centered = pattern1_valid
-        pattern2_centered = pattern2_valid
-    
-    # Calculate weighted covariance
-    covariance = np.sum(weights_valid * pattern1_centered * pattern2_centered)
+    # Weights keep their own (usually fewer) dimensions; the weighted
+    # reductions broadcast them chunk by chunk
+    if isinstance(weights, xr.DataArray):
+        extra_dims = set(weights.dims) - set(dims)
+        if extra_dims:
+            raise ValueError(
+                f"Weights may only span the pattern dimensions {dims}. "
+                f"Got extra dimensions: {sorted(extra_dims)}"
+            )
+        weights = _match_weight_labels(weights, pattern1)
+    elif weights is not None:
+        weights = np.asarray(weights)
+        _broadcast_weights(weights, pattern1.shape)
+        # Name the axes after the trailing pattern dimensions they broadcast
+        # against, and drop the length-1 (broadcast) ones
+        weights = xr.DataArray(weights, dims=dims[len(dims) - weights.ndim:])
+        weights = weights.squeeze(
+            [d for d in weights.dims if weights.sizes[d] == 1 and pattern1.sizes[d] != 1]
+        )
     
-    # Calculate weighted standard deviations
-    std1 = np.sqrt(np.sum(weights_valid * pattern1_centered**2))
-    std2 = np.sqrt(np.sum(weights_valid * pattern2_centered**2))
+    # Reduce chunk-wise with xarray's weighted operations, so no task ever
+    # holds the whole field; the compiled engines only apply in memory and
+    # 'auto' would need a compute to decide, so it centers
+    work_dtype = _working_dtype(dtype)
+    if weights is not None:
+        weights = weights.astype(work_dtype)
+    return _weighted_spatial_correlation(
+        pattern1.astype(work_dtype),
+        pattern2.astype(work_dtype),
+        weights,
+        centered=bool(centered)
+    ).astype(work_dtype)
+
+
+def _as_dataarray_like(
+    data: np.ndarray,
+    template: xr.DataArray,
+    name: str
+) -> xr.DataArray:
+    """Wrap a plain array in a DataArray with the dimensions of template."""
+    data = np.asarray(data)
+    if data.shape != template.shape:
+        raise ValueError(
+            f"{name} must have the same shape as the other inputs. "
+            f"Got {name}: {data.shape}, expected: {template.shape}"
+        )
+    return xr.DataArray(data, dims=template.dims)
+
+
+def _correlation_from_moments(
+    covariance: float,
+    variance1: float,
+    variance2: float
+) -> float:
+    """Correlation from weight-normalized covariance and variances."""
+    std1 = np.sqrt(variance1)
+    std2 = np.sqrt(variance2)
     
-    # Calculate correlation
     if std1 == 0 or std2 == 0 or np.abs(std1) < 1e-10 or np.abs(std2) < 1e-10:
         raise ValueError("One or both patterns have zero variance")
     
@@ -136,18 +630,162 @@ def calculate_pattern_correlation(
     return correlation
 
 
+class PatternCorrelator:
+    """
+    Pattern correlation of one reference pattern against many others.
+    
+    Correlating one observed field against every member of an ensemble
+    repeats the same work for the observation in each call: its NaN (land)
+    mask, the masked and normalized weights and, for centered correlation,
+    its anomalies and variance. PatternCorrelator computes these once, so
+    each call to corr only has to reduce the other pattern.
+    
+    Parameters
+    ----------
+    reference : np.ndarray or xr.DataArray
+        Reference pattern (e.g., observed SST anomalies)
+    weights : np.ndarray, xr.DataArray, or None, optional
+        Weights for each grid point, broadcastable to the reference shape
+        (DataArray weights are broadcast by dimension name). If None, all
+        points are equally weighted. Default is None.
+    centered : bool or "auto", optional
+        If True, remove the weighted means before calculating correlation.
+        The reference anomalies are computed only once, so "auto" would save
+        nothing and is treated as True. Default is True.
+    
+    Examples
+    --------
+    >>> import numpy as np
+    >>> obs = np.random.randn(10, 20)
+    >>> members = [np.random.randn(10, 20) for _ in range(5)]
+    >>> lats = np.linspace(-90, 90, 10)
+    >>> weights = np.cos(np.deg2rad(lats))[:, np.newaxis]
+    >>> correlator = PatternCorrelator(obs, weights=weights)
+    >>> corrs = [correlator.corr(member) for member in members]
+    
+    Notes
+    -----
+    - Gives the same result as calculate_pattern_correlation(reference,
+      pattern, weights, centered) for every pattern
+    - Inputs are loaded into memory; for Dask-backed data use
+      calculate_spatial_correlation_batched instead
+    """
+    
+    def __init__(
+        self,
+        reference: Union[np.ndarray, xr.DataArray],
+        weights: Union[np.ndarray, xr.DataArray, None] = None,
+        centered: Union[bool, str] = True
+    ):
+        _check_centered(centered)
+        centered = bool(centered)
+        
+        if isinstance(reference, xr.DataArray):
+            if isinstance(weights, xr.DataArray):
+                weights = _match_weight_labels(weights, reference)
+                weights = weights.broadcast_like(reference).transpose(*reference.dims)
+            self._template = reference
+            reference = reference.data
+        else:
+            self._template = None
+        
+        reference = np.asarray(reference)
+        self._shape = reference.shape
+        self._centered = centered
+        
+        reference_flat = np.ravel(reference)
+        self._mask = ~np.isnan(reference_flat)
+        n_valid = np.count_nonzero(self._mask)
+        if n_valid == 0:
+            raise ValueError("No valid (non-NaN) data points found in the reference pattern")
+        self._reference = reference_flat[self._mask]
+        
+        if weights is None:
+            self._weights = np.full(n_valid, 1.0 / n_valid)
+        else:
+            if isinstance(weights, xr.DataArray):
+                weights = weights.data
+            weights = _broadcast_weights(np.asarray(weights), self._shape)
+            self._weights = np.ravel(weights)[self._mask]
+            self._weights = self._weights / np.sum(self._weights)
+        
+        # Reference statistics, reused whenever the other pattern has no
+        # additional missing points
+        if centered:
+            self._anomaly = self._reference - np.dot(self._weights, self._reference)
+        else:
+            self._anomaly = self._reference
+        self._variance = np.einsum(
+            'i,i,i->', self._weights, self._anomaly, self._anomaly
+        )
+    
+    def corr(self, pattern: Union[np.ndarray, xr.DataArray]) -> float:
+        """
+        Calculate the pattern correlation between the reference and pattern.
+        
+        Parameters
+        ----------
+        pattern : np.ndarray or xr.DataArray
+            Pattern with the same shape as the reference (e.g., SST anomalies
+            of one ensemble member)
+        
+        Returns
+        -------
+        float
+            Pattern correlation coefficient (between -1 and 1)
+        """
+        if isinstance(pattern, xr.DataArray):
+            if self._template is not None:
+                _, pattern = _align_patterns(self._template, pattern)
+            pattern = pattern.data
+        
+        pattern = np.asarray(pattern)
+        if pattern.shape != self._shape:
+            raise ValueError(
+                f"Pattern must have the same shape as the reference. "
+                f"Got pattern: {pattern.shape}, reference: {self._shape}"
+            )
+        
+        pattern_valid = np.ravel(pattern)[self._mask]
+        
+        # Points missing only in this pattern: reduce over the common subset
+        pattern_nan = np.isnan(pattern_valid)
+        if pattern_nan.any():
+            keep = ~pattern_nan
+            if not keep.any():
+                raise ValueError("No valid (non-NaN) data points found in both patterns")
+            return _pattern_correlation_numpy(
+                self._reference[keep],
+                pattern_valid[keep],
+                self._weights[keep],
+                self._centered
+            )
+        
+        if self._centered:
+            anomaly = pattern_valid - np.dot(self._weights, pattern_valid)
+        else:
+            anomaly = pattern_valid
+        
+        covariance = np.einsum('i,i,i->', self._weights, self._anomaly, anomaly)
+        variance = np.einsum('i,i,i->', self._weights, anomaly, anomaly)
+        
+        return _correlation_from_moments(covariance, self._variance, variance)
+
+
 def calculate_spatial_correlation(
     data1: xr.DataArray,
     data2: xr.DataArray,
     lat_dim: str = 'lat',
     lon_dim: str = 'lon',
     area_weighted: bool = True
-) -> float:
+) -> Union[float, xr.DataArray]:
     """
     Calculate spatial pattern correlation between two xarray DataArrays.
     
-    This is a convenience wrapper around calculate_pattern_correlation
-    specifically for xarray DataArrays with latitude/longitude dimensions.
+    This is the xarray counterpart of calculate_pattern_correlation for
+    DataArrays with latitude/longitude dimensions. In-memory inputs use the
+    fused NumPy reduction; Dask-backed inputs are reduced lazily with
+    xarray's weighted operations, chunk by chunk.
     
     Parameters
     ----------
@@ -164,8 +802,11 @@ def calculate_spatial_correlation(
     
     Returns
     -------
-    float
-        Pattern correlation coefficient
+    float or xr.DataArray
+        Pattern correlation coefficient. For Dask-backed inputs a lazy 0-d
+        DataArray is returned; call ``.compute()`` to evaluate it. Since the
+        lazy result cannot raise, it is NaN where the in-memory path raises
+        ValueError (no valid points, or a zero-variance field).
     
     Examples
     --------
@@ -183,30 +824,243 @@ def calculate_spatial_correlation(
     ... )
     >>> corr = calculate_spatial_correlation(data1, data2)
     """
+    # Same metadata check for both execution paths, so misaligned
+    # coordinates raise instead of being joined on the Dask path
+    data1, data2 = _align_patterns(data1, data2)
+    
     # Calculate area weights if requested
     if area_weighted:
         if lat_dim not in data1.dims:
             raise ValueError(f"Latitude dimension '{lat_dim}' not found in data1")
         
-        # Get latitude values
-        lats = data1[lat_dim].values
-        
-        # Calculate cosine weights
-        weights = np.cos(np.deg2rad(lats))
-        
-        # Broadcast weights to match data shape
-        # Create a weight array that matches the data dimensions
-        weight_array = xr.DataArray(
-            weights,
-            dims=[lat_dim],
-            coords={lat_dim: data1[lat_dim]}
-        )
-        # Broadcast to match full data shape
-        weight_array = weight_array * xr.ones_like(data1)
+        # 1-D cosine weights along latitude; .weighted() broadcasts them
+        # against the full data shape without materializing a weight grid
+        weight_array = _cos_lat_weights(tuple(data1[lat_dim].values), lat_dim)
     else:
         weight_array = None
     
-    # Calculate correlation
-    correlation = calculate_pattern_correlation(data1, data2, weights=weight_array)
+    # In-memory fields go through the fused NumPy reduction, which needs the
+    # fewest temporaries and no task scheduling; the 1-D weights are
+    # broadcast by dimension name
+    if data1.chunks is None and data2.chunks is None:
+        return float(
+            calculate_pattern_correlation(data1, data2, weights=weight_array)
+        )
     
-    return correlation
+    _warn_if_spatially_chunked(data1, lat_dim, lon_dim)
+    _warn_if_spatially_chunked(data2, lat_dim, lon_dim)
+    
+    return _weighted_spatial_correlation(data1, data2, weight_array)
+
+
+def _weighted_spatial_correlation(
+    data1: xr.DataArray,
+    data2: xr.DataArray,
+    weights: Union[xr.DataArray, None],
+    centered: bool = True
+) -> xr.DataArray:
+    """Lazy correlation over all dimensions using xarray weighted reductions."""
+    # Restrict both fields to the points that are valid in both
+    valid_mask = data1.notnull() & data2.notnull()
+    data1 = data1.where(valid_mask)
+    data2 = data2.where(valid_mask)
+    
+    # Calculate weighted means and anomalies
+    if centered:
+        anom1 = data1 - _weighted_mean(data1, weights)
+        anom2 = data2 - _weighted_mean(data2, weights)
+    else:
+        anom1 = data1
+        anom2 = data2
+    
+    # Calculate weighted covariance and variances
+    covariance = _weighted_mean(anom1 * anom2, weights)
+    variance1 = _weighted_mean(anom1 * anom1, weights)
+    variance2 = _weighted_mean(anom2 * anom2, weights)
+    std1 = np.sqrt(variance1)
+    std2 = np.sqrt(variance2)
+    
+    # Zero-variance fields give NaN (rounding leaves the variance slightly
+    # off zero, so the plain ratio would be noise); comparisons with the NaN
+    # moments of fields without valid points are False, so those stay NaN.
+    # The denominator is masked first, so no 0/0 is ever evaluated
+    undefined = (std1 < 1e-10) | (std2 < 1e-10)
+    return covariance / (std1 * std2).where(~undefined)
+
+
+def _warn_if_spatially_chunked(
+    data: xr.DataArray,
+    lat_dim: str,
+    lon_dim: str
+) -> None:
+    """Warn when a Dask-backed field is split into chunks along lat or lon."""
+    split_dims = [
+        dim for dim in (lat_dim, lon_dim)
+        if len(data.chunksizes.get(dim, ())) > 1
+    ]
+    if split_dims:
+        warnings.warn(
+            f"Input is split into several chunks along {split_dims}, so each "
+            f"spatial reduction has to combine results across chunks. "
+            f"Consider data.chunk({{'{lat_dim}': -1, '{lon_dim}': -1}}) and "
+            f"chunking along time or ensemble members instead.",
+            RuntimeWarning,
+            stacklevel=3
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def _cos_lat_weights(lats: tuple, lat_dim: str) -> xr.DataArray:
+    """
+    Cosine-latitude weights as a 1-D DataArray along lat_dim.
+    
+    Cached on the latitude values, so repeated calls on the same grid (e.g.
+    looping over models or time steps) reuse the weights. Always float64:
+    float32 and float64 latitudes with equal values share a cache entry.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    return xr.DataArray(
+        np.cos(np.deg2rad(lats)),
+        dims=[lat_dim],
+        coords={lat_dim: lats}
+    )
+
+
+def _weighted_mean(
+    data: xr.DataArray,
+    weights: Union[xr.DataArray, None]
+) -> xr.DataArray:
+    """Mean over all dimensions of data, skipping NaNs, optionally weighted."""
+    if weights is None:
+        return data.mean()
+    return data.weighted(weights).mean()
+
+
+def calculate_spatial_correlation_batched(
+    data1: xr.DataArray,
+    data2: xr.DataArray,
+    dim: Union[str, Sequence[str]] = ('lat', 'lon'),
+    weights: Union[np.ndarray, xr.DataArray, None] = None
+) -> xr.DataArray:
+    """
+    Calculate pattern correlations reduced over the spatial dimensions only.
+    
+    All other dimensions (e.g. time or ensemble member) are preserved, so a
+    correlation timeseries is computed in one vectorized call instead of one
+    calculate_pattern_correlation call per step. Dask-backed inputs are
+    processed lazily, one chunk of the leading dimensions at a time.
+    
+    Parameters
+    ----------
+    data1 : xr.DataArray
+        First field, containing all dimensions in `dim`
+    data2 : xr.DataArray
+        Second field, containing all dimensions in `dim`
+    dim : str or sequence of str, optional
+        Dimension(s) to compute the correlation over. Default is ('lat', 'lon').
+    weights : np.ndarray, xr.DataArray or None, optional
+        Weights along some or all of the dimensions in `dim` (e.g. cosine of
+        latitude along 'lat'); they are broadcast against the rest. Plain
+        arrays must broadcast against the sizes of `dim`, in that order. If
+        None, all points are equally weighted. Default is None.
+    
+    Returns
+    -------
+    xr.DataArray
+        Pattern correlation for every index of the remaining dimensions.
+        Entries without valid points or with zero variance are NaN.
+    
+    Examples
+    --------
+    >>> import xarray as xr
+    >>> import numpy as np
+    >>> coords = {'time': np.arange(12), 'lat': np.linspace(-80, 80, 10),
+    ...           'lon': np.linspace(0, 360, 20)}
+    >>> data1 = xr.DataArray(np.random.randn(12, 10, 20),
+    ...                      dims=['time', 'lat', 'lon'], coords=coords)
+    >>> data2 = xr.DataArray(np.random.randn(12, 10, 20),
+    ...                      dims=['time', 'lat', 'lon'], coords=coords)
+    >>> weights = np.cos(np.deg2rad(data1['lat']))
+    >>> corr = calculate_spatial_correlation_batched(data1, data2, weights=weights)
+    
+    Notes
+    -----
+    - NaN values are masked out separately for every correlation
+    - With Dask, the dimensions in `dim` must each be a single chunk
+    """
+    dim = [dim] if isinstance(dim, str) else list(dim)
+    for name in dim:
+        if name not in data1.dims or name not in data2.dims:
+            raise ValueError(f"Dimension '{name}' not found in both inputs")
+    
+    # Pass the weights as a plain array shaped to broadcast against the core
+    # dimensions, so they are never expanded to the full grid
+    if weights is not None and not isinstance(weights, xr.DataArray):
+        weights = np.asarray(weights)
+        _broadcast_weights(weights, tuple(data1.sizes[d] for d in dim))
+    elif weights is not None:
+        extra_dims = set(weights.dims) - set(dim)
+        if extra_dims:
+            raise ValueError(
+                f"Weights may only span the correlation dimensions {dim}. "
+                f"Got extra dimensions: {sorted(extra_dims)}"
+            )
+        # Match the weights to data1 by label, as calculate_pattern_correlation
+        # does, so e.g. reversed latitudes are not paired up by position
+        weights = _match_weight_labels(weights, data1)
+        weights = weights.transpose(*[d for d in dim if d in weights.dims])
+        weights = np.asarray(weights.values).reshape(
+            [weights.sizes[d] if d in weights.dims else 1 for d in dim]
+        )
+    
+    return xr.apply_ufunc(
+        _weighted_corr_core,
+        data1,
+        data2,
+        input_core_dims=[dim, dim],
+        kwargs={'weights': weights, 'n_core': len(dim)},
+        vectorize=False,
+        dask='parallelized',
+        output_dtypes=[float],
+    )
+
+
+def _weighted_corr_core(
+    a: np.ndarray,
+    b: np.ndarray,
+    weights: Union[np.ndarray, None],
+    n_core: int
+) -> np.ndarray:
+    """Weighted correlation over the trailing n_core axes of a and b."""
+    batch_shape = a.shape[:a.ndim - n_core]
+    core_shape = a.shape[a.ndim - n_core:]
+    
+    a = a.reshape(batch_shape + (-1,))
+    b = b.reshape(batch_shape + (-1,))
+    if weights is None:
+        weights = np.ones(core_shape)
+    weights = np.broadcast_to(weights, core_shape).reshape(-1)
+    
+    # Masked points get zero weight so every batch reduces over the same axis
+    valid = ~(np.isnan(a) | np.isnan(b))
+    a = np.where(valid, a, 0.0)
+    b = np.where(valid, b, 0.0)
+    w = valid * weights
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wsum = w.sum(axis=-1)
+        mean1 = np.einsum('...i,...i->...', w, a) / wsum
+        mean2 = np.einsum('...i,...i->...', w, b) / wsum
+        a = a - mean1[..., np.newaxis]
+        b = b - mean2[..., np.newaxis]
+        
+        covariance = np.einsum('...i,...i,...i->...', w, a, b)
+        variance1 = np.einsum('...i,...i,...i->...', w, a, a)
+        variance2 = np.einsum('...i,...i,...i->...', w, b, b)
+        
+        correlation = covariance / np.sqrt(variance1 * variance2)
+    
+    # Zero variance patterns are undefined rather than +/-inf or noise
+    std_tol = 1e-10 * np.sqrt(wsum)
+    undefined = (np.sqrt(variance1) < std_tol) | (np.sqrt(variance2) < std_tol)
+    return np.where(undefined, np.nan, correlation)
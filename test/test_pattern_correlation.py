@@ -2,12 +2,21 @@
 Unit tests for pattern correlation functions
 """
 
+import math
+import sys
+import tracemalloc
+import warnings
+
 import pytest
 import numpy as np
 import xarray as xr
 from src.pattern_correlation import (
+    PatternCorrelator,
     calculate_pattern_correlation,
-    calculate_spatial_correlation
+    calculate_spatial_correlation,
+    calculate_spatial_correlation_batched,
+    _compact_weights,
+    _cos_lat_weights
 )
 
 
@@ -49,6 +58,74 @@ class TestPatternCorrelation:
         assert np.isclose(corr_weighted, corr_unweighted), \
             "Uniform weights should give same result as no weights"
     
+    def test_weight_scale_invariance(self):
+        """Test that rescaled weights give the same result and are not modified"""
+        np.random.seed(14)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+        weights = np.random.rand(10, 20)
+        weights_copy = weights.copy()
+        
+        for p1 in (pattern1, np.where(pattern1 > 1.5, np.nan, pattern1)):
+            corr = calculate_pattern_correlation(p1, pattern2, weights=weights)
+            corr_scaled = calculate_pattern_correlation(p1, pattern2, weights=1e3 * weights)
+            assert np.isclose(corr, corr_scaled)
+        np.testing.assert_array_equal(weights, weights_copy)
+    
+    def test_uncentered_large_offset(self):
+        """Test uncentered correlation of absolute temperatures against exact sums"""
+        np.random.seed(16)
+        pattern1 = 300.0 + np.random.randn(100000)
+        pattern2 = 300.0 + np.random.randn(100000)
+        weights = np.random.rand(100000)
+        
+        cov = math.fsum((weights * pattern1 * pattern2).tolist())
+        var1 = math.fsum((weights * pattern1 * pattern1).tolist())
+        var2 = math.fsum((weights * pattern2 * pattern2).tolist())
+        expected = cov / math.sqrt(var1 * var2)
+        
+        corr = calculate_pattern_correlation(
+            pattern1, pattern2, weights=weights, centered=False
+        )
+        assert abs(corr - expected) < 1e-14
+    
+    def test_uncentered_large_offset_float32(self):
+        """Test that uncentered single precision sums keep float32 accuracy"""
+        n = 720 * 1440
+        errors = []
+        for seed in range(4):
+            rng = np.random.RandomState(seed)
+            pattern1 = (300.0 + rng.randn(n)).astype(np.float32)
+            pattern2 = (0.05 + rng.randn(n)).astype(np.float32)
+            weights = rng.rand(n).astype(np.float32)
+            for w in (None, weights):
+                expected = calculate_pattern_correlation(
+                    pattern1, pattern2, weights=w, centered=False
+                )
+                corr = calculate_pattern_correlation(
+                    pattern1, pattern2, weights=w, centered=False, dtype=np.float32
+                )
+                errors.append((corr - expected) / expected)
+        
+        # Sequentially accumulated sums of products of this size are off by
+        # several times float32 resolution, pairwise sums by about one
+        assert np.sqrt(np.mean(np.square(errors))) < 2e-7
+    
+    def test_integer_patterns_uncentered(self):
+        """Test uncentered correlation of integer patterns with float weights"""
+        np.random.seed(19)
+        pattern1 = np.random.randint(280, 300, size=(10, 20))
+        pattern2 = pattern1 + np.random.randint(0, 5, size=(10, 20))
+        weights = np.random.rand(10, 20)
+        
+        expected = calculate_pattern_correlation(
+            pattern1.astype(float), pattern2.astype(float), weights=weights, centered=False
+        )
+        corr = calculate_pattern_correlation(
+            pattern1, pattern2, weights=weights, centered=False
+        )
+        assert np.isclose(corr, expected)
+    
     def test_with_nan_values(self):
         """Test that NaN values are properly handled"""
         pattern1 = np.random.randn(10, 20)
@@ -63,7 +140,42 @@ class TestPatternCorrelation:
         # Should compute without error and return valid correlation
         assert not np.isnan(corr), "Correlation should not be NaN"
         assert -1 <= corr <= 1, "Correlation should be between -1 and 1"
-    
+
+    def test_nan_masking_matches_reference(self):
+        """Test that masked points are excluded exactly as if removed"""
+        np.random.seed(0)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+        weights = np.random.rand(10, 20)
+        pattern1[0:2, 0:3] = np.nan
+        pattern2[5:7, 10:15] = np.nan
+
+        valid = ~(np.isnan(pattern1) | np.isnan(pattern2))
+        w = weights[valid] / weights[valid].sum()
+        a = pattern1[valid] - np.sum(w * pattern1[valid])
+        b = pattern2[valid] - np.sum(w * pattern2[valid])
+        expected = np.sum(w * a * b) / np.sqrt(np.sum(w * a**2) * np.sum(w * b**2))
+
+        corr = calculate_pattern_correlation(pattern1, pattern2, weights=weights)
+        assert np.isclose(corr, expected)
+
+    def test_complete_patterns_match_reference(self):
+        """Test the NaN-free path and that caller weights are left untouched"""
+        np.random.seed(2)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+        weights = np.random.rand(10, 20)
+        weights_before = weights.copy()
+
+        w = weights / weights.sum()
+        a = pattern1 - np.sum(w * pattern1)
+        b = pattern2 - np.sum(w * pattern2)
+        expected = np.sum(w * a * b) / np.sqrt(np.sum(w * a**2) * np.sum(w * b**2))
+
+        corr = calculate_pattern_correlation(pattern1, pattern2, weights=weights)
+        assert np.isclose(corr, expected)
+        np.testing.assert_array_equal(weights, weights_before)
+
     def test_shape_mismatch(self):
         """Test that mismatched shapes raise ValueError"""
         pattern1 = np.random.randn(10, 20)
@@ -72,6 +184,105 @@ class TestPatternCorrelation:
         with pytest.raises(ValueError, match="same shape"):
             calculate_pattern_correlation(pattern1, pattern2)
     
+    def test_broadcast_weights(self):
+        """Test that weights broadcastable to the pattern shape are accepted"""
+        np.random.seed(9)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+        pattern1[0, 0:3] = np.nan
+        lat_weights = np.cos(np.deg2rad(np.linspace(-80, 80, 10)))
+
+        expected = calculate_pattern_correlation(
+            pattern1, pattern2, weights=lat_weights[:, np.newaxis] * np.ones((10, 20))
+        )
+        corr = calculate_pattern_correlation(
+            pattern1, pattern2, weights=lat_weights[:, np.newaxis]
+        )
+        assert np.isclose(corr, expected)
+
+        # DataArray weights broadcast by dimension name
+        da1 = xr.DataArray(pattern1, dims=['lat', 'lon'])
+        da2 = xr.DataArray(pattern2, dims=['lat', 'lon'])
+        weights = xr.DataArray(lat_weights, dims=['lat'])
+        assert np.isclose(calculate_pattern_correlation(da1, da2, weights=weights), expected)
+
+    def test_strided_1d_patterns(self):
+        """Test that non-contiguous 1-D patterns (e.g. columns) are handled"""
+        np.random.seed(13)
+        field1 = np.random.randn(50, 4)
+        field2 = field1 + np.random.randn(50, 4)
+        field1[3, 1] = np.nan
+
+        expected = calculate_pattern_correlation(
+            np.ascontiguousarray(field1[:, 1]), np.ascontiguousarray(field2[:, 1])
+        )
+        corr = calculate_pattern_correlation(field1[:, 1], field2[:, 1])
+        assert np.isclose(corr, expected)
+
+    def test_broadcast_weights_not_expanded(self):
+        """Test that broadcast weights are reduced without a full-size copy"""
+        np.random.seed(23)
+        pattern1 = 290.0 + np.random.randn(200, 400)
+        pattern2 = pattern1 + np.random.randn(200, 400)
+        lat_weights = np.cos(np.deg2rad(np.linspace(-80, 80, 200)))[:, np.newaxis]
+        
+        expected = calculate_pattern_correlation(
+            pattern1, pattern2, weights=lat_weights * np.ones((200, 400)), centered=False
+        )
+        tracemalloc.start()
+        corr = calculate_pattern_correlation(
+            pattern1, pattern2, weights=lat_weights, centered=False
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        assert np.isclose(corr, expected)
+        # Only the product array of the pairwise sum, no expanded weights
+        assert peak < 1.5 * pattern1.nbytes
+    
+    def test_float32_dataarray_weights_not_expanded(self):
+        """Test that float32 DataArray weights are cast before broadcasting"""
+        np.random.seed(32)
+        lats = np.linspace(-80, 80, 200, dtype=np.float32)
+        pattern1 = xr.DataArray(
+            290.0 + np.random.randn(200, 400), dims=['lat', 'lon'], coords={'lat': lats}
+        )
+        pattern2 = pattern1 + np.random.randn(200, 400)
+        weights = np.cos(np.deg2rad(pattern1['lat']))
+        assert weights.dtype == np.float32
+        
+        expected = calculate_pattern_correlation(
+            pattern1.values, pattern2.values,
+            weights=weights.values.astype(np.float64)[:, np.newaxis], centered=False
+        )
+        tracemalloc.start()
+        corr = calculate_pattern_correlation(
+            pattern1, pattern2, weights=weights, centered=False
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        assert np.isclose(corr, expected)
+        # Only the product array of the pairwise sum, no full-grid weights
+        assert peak < 1.5 * pattern1.nbytes
+    
+    def test_compact_weights(self):
+        """Test that trailing broadcast axes are collapsed into a repeat count"""
+        lat_weights = np.linspace(0.1, 1.0, 10)
+        
+        values, repeat = _compact_weights(np.broadcast_to(lat_weights[:, np.newaxis], (10, 20)))
+        np.testing.assert_array_equal(values, lat_weights)
+        assert repeat == 20
+        
+        full = np.random.rand(10, 20)
+        values, repeat = _compact_weights(full)
+        np.testing.assert_array_equal(values, full.ravel())
+        assert repeat == 1
+        
+        values, repeat = _compact_weights(np.broadcast_to(2.0, (10, 20)))
+        np.testing.assert_array_equal(values, [2.0])
+        assert repeat == 200
+    
     def test_weight_shape_mismatch(self):
         """Test that mismatched weight shape raises ValueError"""
         pattern1 = np.random.randn(10, 20)
@@ -89,6 +300,46 @@ class TestPatternCorrelation:
         with pytest.raises(ValueError, match="No valid"):
             calculate_pattern_correlation(pattern1, pattern2)
     
+    def test_auto_centering(self):
+        """Test that centered='auto' matches centered=True for anomalies and offsets"""
+        np.random.seed(17)
+        anomaly1 = np.random.randn(10, 20)
+        anomaly2 = anomaly1 + np.random.randn(10, 20)
+        anomaly1[0, 0:3] = np.nan
+        anomaly2[0, 0:3] = np.nan
+        anomaly1 -= np.nanmean(anomaly1)
+        anomaly2 -= np.nanmean(anomaly2)
+        weights = np.cos(np.deg2rad(np.linspace(-80, 80, 10)))[:, np.newaxis]
+        
+        for offset in (0.0, 290.0):
+            for w in (None, weights):
+                p1 = anomaly1 + offset
+                p2 = anomaly2 + offset
+                expected = calculate_pattern_correlation(p1, p2, weights=w)
+                corr = calculate_pattern_correlation(p1, p2, weights=w, centered="auto")
+                assert np.isclose(corr, expected, rtol=1e-10)
+    
+    def test_auto_centering_integer_patterns(self):
+        """Test that centered='auto' does not overflow for integer patterns"""
+        rng = np.random.default_rng(1)
+        half1 = rng.integers(-100, 100, 1000).astype(np.int16)
+        half2 = (half1 + rng.integers(-30, 30, 1000)).astype(np.int16)
+        # Exactly zero-mean int16 fields whose sums of squares overflow int16
+        pattern1 = np.concatenate([half1, -half1])
+        pattern2 = np.concatenate([half2, -half2])
+        
+        expected = calculate_pattern_correlation(pattern1, pattern2, centered=True)
+        corr = calculate_pattern_correlation(pattern1, pattern2, centered="auto")
+        assert np.isclose(corr, expected)
+    
+    def test_invalid_centered(self):
+        """Test that an unknown centered option raises ValueError"""
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = np.random.randn(10, 20)
+        
+        with pytest.raises(ValueError, match="centered must be"):
+            calculate_pattern_correlation(pattern1, pattern2, centered="yes")
+    
     def test_zero_variance(self):
         """Test that zero variance patterns raise ValueError"""
         pattern1 = np.ones((10, 20))  # Constant pattern, zero variance
@@ -113,6 +364,137 @@ class TestPatternCorrelation:
         assert np.isclose(corr_xr, corr_np), \
             "xarray and numpy inputs should give same result"
     
+    def test_dask_input_stays_lazy(self):
+        """Test that Dask-backed inputs are reduced lazily"""
+        pytest.importorskip("dask")
+        np.random.seed(6)
+        data1 = np.random.randn(10, 20)
+        data2 = data1 + np.random.randn(10, 20)
+        weights = np.random.rand(10, 20)
+        data1[0, 0:3] = np.nan
+
+        da1 = xr.DataArray(data1, dims=['lat', 'lon']).chunk({'lat': 5})
+        da2 = xr.DataArray(data2, dims=['lat', 'lon'])
+
+        corr = calculate_pattern_correlation(da1, da2, weights=weights)
+        assert corr.chunks is not None, "Result should stay lazy"
+        # Reduced chunk by chunk: every task reading the pattern reads one chunk
+        graph = corr.data.dask
+        assert all(
+            len(graph.layers[name]) == da1.data.npartitions
+            for name in graph.layers if da1.data.name in graph.dependencies[name]
+        )
+
+        expected = calculate_pattern_correlation(data1, data2, weights=weights)
+        assert np.isclose(float(corr.compute()), expected)
+
+    def test_dask_input_options(self):
+        """Test centered, dtype and zero variance on the Dask path"""
+        pytest.importorskip("dask")
+        np.random.seed(30)
+        data1 = 290.0 + np.random.randn(10, 20)
+        data2 = data1 + np.random.randn(10, 20)
+        weights = np.cos(np.deg2rad(np.linspace(-80, 80, 10)))[:, np.newaxis]
+        da1 = xr.DataArray(data1, dims=['lat', 'lon']).chunk({'lat': 5})
+
+        for centered in (True, False):
+            corr = calculate_pattern_correlation(da1, data2, weights=weights, centered=centered)
+            expected = calculate_pattern_correlation(
+                data1, data2, weights=weights, centered=centered
+            )
+            assert np.isclose(float(corr.compute()), expected)
+
+        corr32 = calculate_pattern_correlation(da1, data2, dtype=np.float32)
+        assert corr32.dtype == np.float32
+        assert corr32.compute().dtype == np.float32
+
+        constant = xr.full_like(da1, 290.0)
+        with warnings.catch_warnings():
+            # The undefined correlation is masked, not evaluated as 0/0
+            warnings.simplefilter("error")
+            assert np.isnan(float(calculate_pattern_correlation(constant, data2).compute()))
+
+    def test_dask_input_with_different_dim_names(self):
+        """Test that differently named dimensions are compared positionally"""
+        pytest.importorskip("dask")
+        np.random.seed(24)
+        values1 = np.random.randn(10, 20)
+        values2 = values1 + np.random.randn(10, 20)
+        da1 = xr.DataArray(values1, dims=['lat', 'lon'])
+        da2 = xr.DataArray(values2, dims=['y', 'x'])
+        
+        expected = calculate_pattern_correlation(da1, da2)
+        corr = calculate_pattern_correlation(da1.chunk(), da2.chunk())
+        assert np.isclose(float(corr.compute()), expected)
+        
+        da3 = xr.DataArray(np.random.randn(20, 10), dims=['y', 'x'])
+        with pytest.raises(ValueError, match="same shape"):
+            calculate_pattern_correlation(da1, da3)
+        with pytest.raises(ValueError, match="same shape"):
+            calculate_pattern_correlation(da1.chunk(), da3.chunk())
+    
+    def test_dask_input_with_1d_weights(self):
+        """Test that 1-D DataArray weights broadcast against Dask patterns"""
+        pytest.importorskip("dask")
+        np.random.seed(13)
+        values1 = np.random.randn(3, 10, 20)
+        values2 = values1 + np.random.randn(3, 10, 20)
+        lat_weights = np.cos(np.deg2rad(np.linspace(-80, 80, 10)))
+
+        da1 = xr.DataArray(values1, dims=['time', 'lat', 'lon'])
+        da2 = xr.DataArray(values2, dims=['time', 'lat', 'lon'])
+        weights = xr.DataArray(lat_weights, dims=['lat'])
+
+        corr = calculate_pattern_correlation(da1.chunk({'time': 1}), da2, weights=weights)
+        expected = calculate_pattern_correlation(
+            values1, values2, weights=lat_weights[:, np.newaxis]
+        )
+        assert np.isclose(float(corr.compute()), expected)
+
+    def test_xarray_misaligned_not_loaded(self):
+        """Test that misaligned DataArrays are rejected before any compute"""
+        dask = pytest.importorskip("dask")
+        da1 = xr.DataArray(
+            np.random.randn(10, 20), dims=['lat', 'lon'],
+            coords={'lat': np.arange(10), 'lon': np.arange(20)}
+        ).chunk()
+        da2 = da1.assign_coords(lon=np.arange(20) + 0.5)
+
+        def no_compute(*args, **kwargs):
+            pytest.fail("Inputs should not be computed")
+
+        with dask.config.set(scheduler=no_compute):
+            with pytest.raises(ValueError, match="same shape"):
+                calculate_pattern_correlation(da1, da2)
+            with pytest.raises(ValueError, match="same shape"):
+                calculate_pattern_correlation(da1, da1.isel(lon=slice(0, 15)))
+
+    def test_xarray_transposed_input(self):
+        """Test that DataArrays are matched by dimension name"""
+        values1 = np.random.randn(10, 20)
+        values2 = values1 + np.random.randn(10, 20)
+        da1 = xr.DataArray(values1, dims=['lat', 'lon'])
+        da2 = xr.DataArray(values2, dims=['lat', 'lon'])
+
+        corr = calculate_pattern_correlation(da1, da2.transpose('lon', 'lat'))
+        assert np.isclose(corr, calculate_pattern_correlation(values1, values2))
+
+    def test_weights_not_covering_pattern(self):
+        """Test that DataArray weights missing some labels raise ValueError"""
+        lats = np.linspace(-80, 80, 10)
+        da1 = xr.DataArray(np.random.randn(10, 20), dims=['lat', 'lon'], coords={'lat': lats})
+        da2 = da1 + np.random.randn(10, 20)
+        weights = np.cos(np.deg2rad(da1['lat'])).isel(lat=slice(0, 5))
+
+        with pytest.raises(ValueError, match="same 'lat' coordinates"):
+            calculate_pattern_correlation(da1, da2, weights=weights)
+        with pytest.raises(ValueError, match="same 'lat' coordinates"):
+            PatternCorrelator(da1, weights=weights)
+
+        pytest.importorskip("dask")
+        with pytest.raises(ValueError, match="same 'lat' coordinates"):
+            calculate_pattern_correlation(da1.chunk(), da2, weights=weights)
+
     def test_centered_vs_uncentered(self):
         """Test centered vs uncentered correlation"""
         pattern1 = np.random.randn(10, 20) + 5  # Add offset
@@ -126,6 +508,331 @@ class TestPatternCorrelation:
         assert -1 <= corr_centered <= 1
         assert -1 <= corr_uncentered <= 1
 
+    def test_float32_dtype(self):
+        """Test that single precision agrees with double precision"""
+        np.random.seed(4)
+        pattern1 = np.random.randn(10, 20).astype(np.float32)
+        pattern2 = pattern1 + np.random.randn(10, 20).astype(np.float32)
+        weights = np.random.rand(10, 20)
+        pattern1[0, 0:3] = np.nan
+
+        corr64 = calculate_pattern_correlation(pattern1, pattern2, weights=weights)
+        corr32 = calculate_pattern_correlation(
+            pattern1, pattern2, weights=weights, dtype=np.float32
+        )
+
+        assert corr32.dtype == np.float32
+        assert np.isclose(corr32, corr64, rtol=1e-5)
+        assert weights.dtype == np.float64, "Caller arrays should not be cast in place"
+
+    def test_default_dtype_computes_in_float64(self):
+        """Test that float32 inputs are reduced in float64 when dtype is None"""
+        np.random.seed(25)
+        pattern1 = np.random.randn(100, 200).astype(np.float32)
+        pattern2 = pattern1 + np.random.randn(100, 200).astype(np.float32)
+
+        expected = calculate_pattern_correlation(
+            pattern1.astype(np.float64), pattern2.astype(np.float64)
+        )
+        corr = calculate_pattern_correlation(pattern1, pattern2)
+
+        assert corr.dtype == np.float64
+        assert np.isclose(corr, expected, rtol=1e-14, atol=0)
+
+    @pytest.mark.parametrize("dtype", [np.int32, np.float16, np.complex128])
+    def test_invalid_dtype(self, dtype):
+        """Test that dtypes other than float32 and float64 raise ValueError"""
+        pattern = np.random.randn(10, 20)
+
+        with pytest.raises(ValueError, match="dtype must be"):
+            calculate_pattern_correlation(pattern, pattern + 1.0, dtype=dtype)
+
+    @pytest.mark.parametrize("engine", ["c", "numexpr"])
+    def test_float64_engines_do_not_round_inputs(self, engine):
+        """Test that float64-only engines only cast the result to float32"""
+        pytest.importorskip("src._pcorr_c" if engine == "c" else "numexpr")
+        np.random.seed(31)
+        # Offset so large that float32 inputs would lose most of the signal
+        pattern1 = 1e4 + 1e-3 * np.random.randn(10, 20)
+        pattern2 = pattern1 + 1e-3 * np.random.randn(10, 20)
+
+        expected = calculate_pattern_correlation(pattern1, pattern2)
+        corr = calculate_pattern_correlation(
+            pattern1, pattern2, engine=engine, dtype=np.float32
+        )
+        assert corr.dtype == np.float32
+        assert np.isclose(corr, expected, rtol=1e-6)
+
+    def test_unknown_engine(self):
+        """Test that an unknown engine raises ValueError"""
+        pattern = np.random.randn(10, 20)
+
+        with pytest.raises(ValueError, match="Unknown engine"):
+            calculate_pattern_correlation(pattern, pattern, engine="fortran")
+
+
+_ENGINE_MODULES = {"numba": "numba", "c": "src._pcorr_c", "numexpr": "numexpr"}
+
+
+class TestEngines:
+    """Test suite for the optional backends of calculate_pattern_correlation"""
+
+    @pytest.fixture(params=sorted(_ENGINE_MODULES))
+    def engine(self, request):
+        pytest.importorskip(_ENGINE_MODULES[request.param])
+        return request.param
+
+    @pytest.mark.parametrize("centered", [True, False])
+    def test_matches_numpy_engine(self, engine, centered):
+        """Test that the engine reproduces the numpy result"""
+        np.random.seed(3)
+        pattern1 = 290.0 + np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+        weights = np.random.rand(10, 20)
+        pattern1[0:2, 0:3] = np.nan
+        pattern2[5:7, 10:15] = np.nan
+
+        for w in (None, weights, weights[:, :1]):
+            corr_numpy = calculate_pattern_correlation(
+                pattern1, pattern2, weights=w, centered=centered
+            )
+            corr_engine = calculate_pattern_correlation(
+                pattern1, pattern2, weights=w, centered=centered, engine=engine
+            )
+            assert np.isclose(corr_engine, corr_numpy, rtol=1e-10)
+
+    def test_large_pattern_with_offset(self, engine):
+        """Test a large, offset field with broadcast latitude weights"""
+        np.random.seed(7)
+        pattern1 = 290.0 + np.random.randn(180, 360)
+        pattern2 = pattern1 + np.random.randn(180, 360)
+        weights = np.cos(np.deg2rad(np.linspace(-89.5, 89.5, 180)))[:, np.newaxis]
+        pattern1[:20, :50] = np.nan
+
+        corr_numpy = calculate_pattern_correlation(pattern1, pattern2, weights=weights)
+        corr_engine = calculate_pattern_correlation(
+            pattern1, pattern2, weights=weights, engine=engine
+        )
+        assert np.isclose(corr_engine, corr_numpy, rtol=1e-10)
+
+    def test_auto_centering(self, engine):
+        """Test that the engine treats centered='auto' as True"""
+        np.random.seed(18)
+        pattern1 = 290.0 + np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+
+        corr_auto = calculate_pattern_correlation(
+            pattern1, pattern2, centered="auto", engine=engine
+        )
+        assert np.isclose(corr_auto, calculate_pattern_correlation(pattern1, pattern2))
+
+    def test_float32_dtype(self, engine):
+        """Test that the result has the requested dtype"""
+        np.random.seed(4)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+
+        corr64 = calculate_pattern_correlation(pattern1, pattern2, engine=engine)
+        corr32 = calculate_pattern_correlation(
+            pattern1, pattern2, engine=engine, dtype=np.float32
+        )
+        assert corr32.dtype == np.float32
+        assert np.isclose(corr32, corr64, rtol=1e-5)
+
+    def test_all_nan_patterns(self, engine):
+        """Test that all-NaN patterns raise ValueError"""
+        pattern1 = np.full((10, 20), np.nan)
+        pattern2 = np.random.randn(10, 20)
+
+        with pytest.raises(ValueError, match="No valid"):
+            calculate_pattern_correlation(pattern1, pattern2, engine=engine)
+
+    def test_zero_variance(self, engine):
+        """Test that zero variance patterns raise ValueError"""
+        pattern1 = np.ones((10, 20))
+        pattern2 = np.random.randn(10, 20)
+
+        with pytest.raises(ValueError, match="zero variance"):
+            calculate_pattern_correlation(pattern1, pattern2, engine=engine)
+
+
+class TestNumbaEngine:
+    """Test suite for the numba kernels"""
+
+    @pytest.fixture(autouse=True)
+    def _require_numba(self):
+        pytest.importorskip("numba")
+
+    @pytest.mark.parametrize("centered", [True, False])
+    def test_chunk_merge(self, centered):
+        """Test that merging per-thread partial moments matches one chunk"""
+        from src._pcorr_numba import _weighted_corr_chunked
+
+        np.random.seed(8)
+        pattern1 = 290.0 + np.random.randn(50000)
+        pattern2 = pattern1 + np.random.randn(50000)
+        weights = np.random.rand(50000)
+        pattern1[:300] = np.nan
+        weights[1000:2000] = 0.0
+
+        single = _weighted_corr_chunked(pattern1, pattern2, weights, centered, 1)
+        merged = _weighted_corr_chunked(pattern1, pattern2, weights, centered, 7)
+
+        assert single[0] == merged[0]
+        np.testing.assert_allclose(merged[1:], single[1:], rtol=1e-10)
+
+    @pytest.mark.parametrize("centered", [True, False])
+    def test_zero_weight_sum(self, centered):
+        """Test that zero weights at every valid point give NaN moments"""
+        from src._pcorr_numba import _make_kernel, _weighted_corr_chunked
+
+        pattern1 = np.random.randn(1000)
+        pattern2 = np.random.randn(1000)
+
+        for w, repeat in ((np.zeros(1000), 1), (np.zeros(25), 40)):
+            for result in (
+                _weighted_corr_chunked(pattern1, pattern2, w, centered, 3, repeat),
+                _make_kernel(1000)(pattern1, pattern2, w, centered, repeat),
+            ):
+                assert result[0] == 1000
+                assert np.all(np.isnan(result[1:]))
+
+    @pytest.mark.parametrize("centered", [True, False])
+    def test_specialized_kernel(self, centered):
+        """Test that the fixed-length kernel matches the generic kernel"""
+        from src._pcorr_numba import _make_kernel, _weighted_corr_chunked
+
+        np.random.seed(15)
+        pattern1 = 290.0 + np.random.randn(1000)
+        pattern2 = pattern1 + np.random.randn(1000)
+        weights = np.random.rand(1000)
+        pattern2[100:150] = np.nan
+
+        kernel = _make_kernel(1000)
+        assert _make_kernel(1000) is kernel
+        # Per-point weights, and one weight per run of 40 points
+        for w, repeat in ((np.empty(0), 1), (weights, 1), (weights[:25], 40)):
+            expected = _weighted_corr_chunked(pattern1, pattern2, w, centered, 1, repeat)
+            result = kernel(pattern1, pattern2, w, centered, repeat)
+            assert result[0] == expected[0]
+            np.testing.assert_allclose(result[1:], expected[1:], rtol=1e-10)
+
+    def test_specialized_kernel_opt_in(self, monkeypatch):
+        """Test that standard grids use the cached kernel unless opted in"""
+        from src import _pcorr_numba
+
+        def no_specialized_kernel(n):
+            pytest.fail("The specialized kernel should not be compiled")
+
+        monkeypatch.setattr(_pcorr_numba, "_make_kernel", no_specialized_kernel)
+        pattern1 = np.random.randn(180 * 360)
+        pattern2 = pattern1 + np.random.randn(180 * 360)
+        count, *_ = _pcorr_numba._weighted_corr(pattern1, pattern2, np.empty(0), True)
+        assert count == 180 * 360
+
+    @pytest.mark.parametrize("centered", [True, False])
+    def test_repeated_weights(self, centered):
+        """Test that one weight per run of points matches expanded weights"""
+        from src._pcorr_numba import _weighted_corr_chunked
+
+        np.random.seed(22)
+        pattern1 = 290.0 + np.random.randn(50000)
+        pattern2 = pattern1 + np.random.randn(50000)
+        row_weights = np.random.rand(500)
+        pattern1[:300] = np.nan
+
+        expanded = np.repeat(row_weights, 100)
+        single = _weighted_corr_chunked(pattern1, pattern2, expanded, centered, 1)
+        # Chunk boundaries that do not fall on row boundaries
+        repeated = _weighted_corr_chunked(pattern1, pattern2, row_weights, centered, 7, 100)
+
+        assert single[0] == repeated[0]
+        np.testing.assert_allclose(repeated[1:], single[1:], rtol=1e-10)
+
+    def test_missing_numba(self, monkeypatch):
+        """Test that a missing numba raises an ImportError naming it"""
+        monkeypatch.setitem(sys.modules, "numba", None)
+        monkeypatch.delitem(sys.modules, "src._pcorr_numba", raising=False)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+
+        with pytest.raises(ImportError, match="requires numba"):
+            calculate_pattern_correlation(pattern1, pattern2, engine="numba")
+
+
+class TestCEngine:
+    """Test suite for the fallback of engine="c" without the extension"""
+
+    def test_fallback_without_extension(self, monkeypatch):
+        """Test that a missing extension falls back to the numpy engine"""
+        monkeypatch.setitem(sys.modules, "src._pcorr_c", None)
+        pattern1 = np.random.randn(10, 20)
+        pattern2 = pattern1 + np.random.randn(10, 20)
+
+        with pytest.warns(RuntimeWarning, match="falling back"):
+            corr = calculate_pattern_correlation(pattern1, pattern2, engine="c")
+        assert np.isclose(corr, calculate_pattern_correlation(pattern1, pattern2))
+
+
+class TestPatternCorrelator:
+    """Test suite for the PatternCorrelator class"""
+
+    @pytest.mark.parametrize("centered", [True, False, "auto"])
+    def test_matches_pattern_correlation(self, centered):
+        """Test that reused reference statistics give the same correlations"""
+        np.random.seed(11)
+        reference = np.random.randn(10, 20) + 1
+        reference[0:2, 0:3] = np.nan  # e.g. land points
+        weights = np.cos(np.deg2rad(np.linspace(-80, 80, 10)))[:, np.newaxis]
+
+        members = [reference + np.random.randn(10, 20) for _ in range(3)]
+        members[1][5:7, 10:15] = np.nan  # missing only in this member
+
+        correlator = PatternCorrelator(reference, weights=weights, centered=centered)
+        for member in members:
+            expected = calculate_pattern_correlation(
+                reference, member, weights=weights, centered=centered
+            )
+            assert np.isclose(correlator.corr(member), expected)
+
+    def test_xarray_input(self):
+        """Test with DataArray reference, members and 1-D weights"""
+        np.random.seed(12)
+        lats = np.linspace(-80, 80, 10)
+        reference = xr.DataArray(np.random.randn(10, 20), dims=['lat', 'lon'], coords={'lat': lats})
+        member = reference + xr.DataArray(
+            np.random.randn(10, 20), dims=['lat', 'lon'], coords={'lat': lats}
+        )
+        weights = np.cos(np.deg2rad(reference['lat']))
+
+        correlator = PatternCorrelator(reference, weights=weights)
+        expected = calculate_pattern_correlation(reference, member, weights=weights)
+        assert np.isclose(correlator.corr(member.transpose('lon', 'lat')), expected)
+
+    def test_shape_mismatch(self):
+        """Test that a pattern of a different shape raises ValueError"""
+        correlator = PatternCorrelator(np.random.randn(10, 20))
+
+        with pytest.raises(ValueError, match="same shape"):
+            correlator.corr(np.random.randn(10, 15))
+
+    def test_invalid_centered(self):
+        """Test that an unknown centered option raises ValueError"""
+        with pytest.raises(ValueError, match="centered must be"):
+            PatternCorrelator(np.random.randn(10, 20), centered="yes")
+
+    def test_all_nan_reference(self):
+        """Test that an all-NaN reference raises ValueError"""
+        with pytest.raises(ValueError, match="No valid"):
+            PatternCorrelator(np.full((10, 20), np.nan))
+
+    def test_zero_variance(self):
+        """Test that a constant pattern raises ValueError"""
+        correlator = PatternCorrelator(np.random.randn(10, 20))
+
+        with pytest.raises(ValueError, match="zero variance"):
+            correlator.corr(np.ones((10, 20)))
+
 
 class TestSpatialCorrelation:
     """Test suite for calculate_spatial_correlation function"""
@@ -213,6 +920,243 @@ class TestSpatialCorrelation:
         )
         assert -1 <= corr <= 1
 
+    def test_matches_pattern_correlation(self):
+        """Test that spatial correlation agrees with the numpy implementation"""
+        np.random.seed(1)
+        lats = np.linspace(-80, 80, 10)
+        lons = np.linspace(0, 360, 20)
+        values1 = np.random.randn(10, 20)
+        values2 = values1 + np.random.randn(10, 20)
+        values1[0, 0:4] = np.nan
+        values2[3, 5] = np.nan
+
+        data1 = xr.DataArray(values1, dims=['lat', 'lon'], coords={'lat': lats, 'lon': lons})
+        data2 = xr.DataArray(values2, dims=['lat', 'lon'], coords={'lat': lats, 'lon': lons})
+
+        weights = np.cos(np.deg2rad(lats))[:, np.newaxis] * np.ones((10, 20))
+        expected = calculate_pattern_correlation(values1, values2, weights=weights)
+
+        corr = calculate_spatial_correlation(data1, data2, area_weighted=True)
+        assert np.isclose(corr, expected)
+
+    def test_weights_cached_across_calls(self):
+        """Test that cosine weights are reused for the same latitude grid"""
+        lats = np.linspace(-85, 85, 12)
+        lons = np.linspace(0, 360, 20)
+        coords = {'lat': lats, 'lon': lons}
+        data1 = xr.DataArray(np.random.randn(12, 20), dims=['lat', 'lon'], coords=coords)
+        data2 = xr.DataArray(np.random.randn(12, 20), dims=['lat', 'lon'], coords=coords)
+
+        _cos_lat_weights.cache_clear()
+        corr_first = calculate_spatial_correlation(data1, data2)
+        corr_second = calculate_spatial_correlation(data1, data2)
+
+        assert _cos_lat_weights.cache_info().hits == 1
+        assert corr_first == corr_second
+
+    def test_weights_cached_across_lat_dtypes(self):
+        """Test that float32 latitudes do not leave float32 weights in the cache"""
+        lats = np.linspace(-85, 85, 12, dtype=np.float32)
+        lons = np.linspace(0, 360, 20)
+        values1 = np.random.randn(12, 20)
+        values2 = values1 + np.random.randn(12, 20)
+
+        _cos_lat_weights.cache_clear()
+        corrs = []
+        for lat_values in (lats, lats.astype(np.float64)):
+            coords = {'lat': lat_values, 'lon': lons}
+            data1 = xr.DataArray(values1, dims=['lat', 'lon'], coords=coords)
+            data2 = xr.DataArray(values2, dims=['lat', 'lon'], coords=coords)
+            corrs.append(calculate_spatial_correlation(data1, data2))
+            weights = _cos_lat_weights(tuple(data1['lat'].values), 'lat')
+            assert weights.dtype == np.float64
+            assert weights['lat'].dtype == np.float64
+
+        assert corrs[0] == corrs[1]
+
+    def test_misaligned_coordinates(self):
+        """Test that mismatched coordinates raise on both execution paths"""
+        pytest.importorskip("dask")
+        lats = np.linspace(-80, 80, 10)
+        lons = np.linspace(0, 360, 20)
+        data1 = xr.DataArray(
+            np.random.randn(10, 20), dims=['lat', 'lon'], coords={'lat': lats, 'lon': lons}
+        )
+
+        for other_lats in (lats + 1e-9, lats[::-1]):
+            data2 = xr.DataArray(
+                np.random.randn(10, 20), dims=['lat', 'lon'],
+                coords={'lat': other_lats, 'lon': lons}
+            )
+            with pytest.raises(ValueError, match="same shape and coordinates"):
+                calculate_spatial_correlation(data1, data2)
+            with pytest.raises(ValueError, match="same shape and coordinates"):
+                calculate_spatial_correlation(data1.chunk(), data2.chunk())
+
+    def test_dask_input_stays_lazy(self):
+        """Test that Dask-backed inputs return a lazy result"""
+        pytest.importorskip("dask")
+        lats = np.linspace(-80, 80, 10)
+        lons = np.linspace(0, 360, 20)
+        values1 = np.random.randn(10, 20)
+        values2 = np.random.randn(10, 20)
+
+        data1 = xr.DataArray(values1, dims=['lat', 'lon'], coords={'lat': lats, 'lon': lons})
+        data2 = xr.DataArray(values2, dims=['lat', 'lon'], coords={'lat': lats, 'lon': lons})
+
+        corr = calculate_spatial_correlation(data1.chunk(), data2.chunk())
+        assert corr.chunks is not None, "Result should stay lazy"
+        assert np.isclose(float(corr.compute()), calculate_spatial_correlation(data1, data2))
+
+    def test_dask_zero_variance_is_nan(self):
+        """Test that a constant Dask-backed field gives NaN instead of raising"""
+        pytest.importorskip("dask")
+        lats = np.linspace(-80, 80, 10)
+        lons = np.linspace(0, 360, 20)
+        coords = {'lat': lats, 'lon': lons}
+        data1 = xr.DataArray(np.full((10, 20), 290.1), dims=['lat', 'lon'], coords=coords)
+        data2 = xr.DataArray(np.random.randn(10, 20), dims=['lat', 'lon'], coords=coords)
+
+        with pytest.raises(ValueError, match="zero variance"):
+            calculate_spatial_correlation(data1, data2)
+
+        corr = calculate_spatial_correlation(data1.chunk(), data2.chunk())
+        assert np.isnan(float(corr.compute()))
+
+    def test_warns_on_spatially_split_chunks(self):
+        """Test that chunking along lat/lon triggers a rechunking hint"""
+        pytest.importorskip("dask")
+        lats = np.linspace(-80, 80, 10)
+        lons = np.linspace(0, 360, 20)
+        coords = {'time': np.arange(4), 'lat': lats, 'lon': lons}
+        data1 = xr.DataArray(np.random.randn(4, 10, 20), dims=['time', 'lat', 'lon'], coords=coords)
+        data2 = xr.DataArray(np.random.randn(4, 10, 20), dims=['time', 'lat', 'lon'], coords=coords)
+
+        with pytest.warns(RuntimeWarning, match="chunk"):
+            calculate_spatial_correlation(data1.chunk({'lat': 5}), data2.chunk({'lat': 5}))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            corr = calculate_spatial_correlation(data1.chunk({'time': 1}), data2.chunk({'time': 1}))
+        assert np.isclose(float(corr.compute()), calculate_spatial_correlation(data1, data2))
+
+
+class TestSpatialCorrelationBatched:
+    """Test suite for calculate_spatial_correlation_batched function"""
+
+    @staticmethod
+    def _make_data(seed=5):
+        np.random.seed(seed)
+        coords = {
+            'time': np.arange(4),
+            'lat': np.linspace(-80, 80, 10),
+            'lon': np.linspace(0, 360, 20),
+        }
+        values1 = np.random.randn(4, 10, 20)
+        values2 = values1 + np.random.randn(4, 10, 20)
+        values1[1, 0:2, 0:3] = np.nan
+        values2[2, 5, :] = np.nan
+        data1 = xr.DataArray(values1, dims=['time', 'lat', 'lon'], coords=coords)
+        data2 = xr.DataArray(values2, dims=['time', 'lat', 'lon'], coords=coords)
+        return data1, data2
+
+    def test_matches_loop(self):
+        """Test that the batched result matches one call per time step"""
+        data1, data2 = self._make_data()
+        weights = np.cos(np.deg2rad(data1['lat']))
+
+        corr = calculate_spatial_correlation_batched(data1, data2, weights=weights)
+        assert corr.dims == ('time',)
+
+        for t in range(data1.sizes['time']):
+            expected = calculate_spatial_correlation(data1.isel(time=t), data2.isel(time=t))
+            assert np.isclose(corr.isel(time=t), expected)
+
+    def test_weights_matched_by_label(self):
+        """Test that weights are aligned to the data by coordinate, not position"""
+        data1, data2 = self._make_data()
+        weights = xr.DataArray(
+            np.linspace(0.1, 1.0, 10), dims=['lat'], coords={'lat': data1['lat'].values}
+        )
+
+        expected = calculate_spatial_correlation_batched(data1, data2, weights=weights)
+        corr = calculate_spatial_correlation_batched(
+            data1, data2, weights=weights.isel(lat=slice(None, None, -1))
+        )
+        np.testing.assert_allclose(corr, expected)
+        assert np.isclose(
+            corr.isel(time=0),
+            calculate_pattern_correlation(data1.isel(time=0), data2.isel(time=0), weights=weights)
+        )
+
+        shifted = weights.assign_coords(lat=weights['lat'] + 1e-9)
+        with pytest.raises(ValueError, match="same 'lat' coordinates"):
+            calculate_spatial_correlation_batched(data1, data2, weights=shifted)
+
+    def test_unweighted(self):
+        """Test that omitting weights gives the unweighted correlation"""
+        data1, data2 = self._make_data()
+
+        corr = calculate_spatial_correlation_batched(data1, data2)
+        expected = calculate_pattern_correlation(data1.isel(time=0), data2.isel(time=0))
+        assert np.isclose(corr.isel(time=0), expected)
+
+    def test_zero_variance_is_nan(self):
+        """Test that zero variance entries are NaN instead of raising"""
+        data1, data2 = self._make_data()
+        data1[0] = 1.0
+
+        corr = calculate_spatial_correlation_batched(data1, data2)
+        assert np.isnan(corr.isel(time=0))
+        assert not np.isnan(corr.isel(time=1))
+
+    def test_dask_input(self):
+        """Test that Dask-backed inputs are computed lazily per chunk"""
+        pytest.importorskip("dask")
+        data1, data2 = self._make_data()
+        weights = np.cos(np.deg2rad(data1['lat']))
+
+        corr_lazy = calculate_spatial_correlation_batched(
+            data1.chunk({'time': 1}), data2.chunk({'time': 1}), weights=weights
+        )
+        assert corr_lazy.chunks is not None, "Result should stay lazy"
+
+        corr = calculate_spatial_correlation_batched(data1, data2, weights=weights)
+        np.testing.assert_allclose(corr_lazy.compute(), corr)
+
+    def test_weights_outside_dim(self):
+        """Test that weights along non-correlation dimensions raise ValueError"""
+        data1, data2 = self._make_data()
+        weights = xr.ones_like(data1['time'], dtype=float)
+
+        with pytest.raises(ValueError, match="Weights may only span"):
+            calculate_spatial_correlation_batched(data1, data2, weights=weights)
+
+    def test_single_dim_string(self):
+        """Test that a single dimension name is not split into characters"""
+        data1, data2 = self._make_data()
+
+        corr = calculate_spatial_correlation_batched(data1, data2, dim='lon')
+        expected = calculate_spatial_correlation_batched(data1, data2, dim=['lon'])
+        assert corr.dims == ('time', 'lat')
+        np.testing.assert_allclose(corr, expected)
+
+    def test_array_weights(self):
+        """Test that plain array weights broadcast against the core dimensions"""
+        data1, data2 = self._make_data()
+        lat_weights = np.cos(np.deg2rad(data1['lat'].values))
+
+        expected = calculate_spatial_correlation_batched(
+            data1, data2, weights=xr.DataArray(lat_weights, dims=['lat'])
+        )
+        corr = calculate_spatial_correlation_batched(
+            data1, data2, weights=lat_weights[:, np.newaxis]
+        )
+        np.testing.assert_allclose(corr, expected)
+
+        with pytest.raises(ValueError, match="broadcastable"):
+            calculate_spatial_correlation_batched(data1, data2, weights=lat_weights)
+
 
 class TestEdgeCases:
     """Test edge cases and special scenarios"""